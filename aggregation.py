@@ -0,0 +1,177 @@
+"""Evaluations summaries computed locally from one event snapshot.
+
+The event table rows carry the original journal entry in raw_json. Only
+the events some summary needs are parsed, once per period snapshot; all
+summaries are then derived from a single groupby over (cmdr, event kind).
+"""
+import ast
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+import api_client
+from periods import period_params, slice_period, time_index
+from singleflight import SingleFlight
+
+# Faction of the "Influence EIC" summary
+EIC_FACTION = os.getenv("EIC_FACTION", "Communism Interstellar")
+
+# Columns of table/event needed for the snapshot; the amounts only exist in raw_json
+EVENT_COLUMNS = ["cmdr", "event", "timestamp", "raw_json"]
+
+# Journal fields summed per cmdr and event kind
+AMOUNT_FIELDS = ["TotalCost", "TotalSale", "Count", "Amount", "TotalEarnings", "BaseValue", "Bonus", "Fine", "Bounty"]
+
+# Events some summary uses -> whether their raw_json has to be parsed
+# (MissionFailed is only counted)
+JOURNAL_EVENTS = {
+    "MarketBuy": True,
+    "MarketSell": True,
+    "MissionCompleted": True,
+    "MissionFailed": False,
+    "RedeemVoucher": True,
+    "MultiSellExplorationData": True,
+    "SellExplorationData": True,
+    "CommitCrime": True,
+}
+
+# period -> (loaded at, parsed events); the raw payload is not kept
+_events = {}
+_events_lock = threading.Lock()
+_flight = SingleFlight()
+
+
+def period_summaries(period, top=None):
+    """All Evaluations summaries of a period, keyed like the summary/<name> endpoints"""
+    return summarize(get_events(period), top)
+
+
+def get_events(period):
+    """Parsed, time-indexed events of a period.
+
+    Only the period (from/to) and EVENT_COLUMNS are requested. The parsed
+    frame is kept for the table/event cache TTL or until the next tick,
+    instead of the much larger raw payload. The period is always cut out
+    locally as well, in case the API ignores from/to.
+    """
+    with _events_lock:
+        cached = _events.get(period)
+    if cached is not None and time.time() - cached[0] < api_client.get_cache_ttl("table/event"):
+        return cached[1]
+    return _flight.do(period, lambda: _load_events(period))
+
+
+def _load_events(period):
+    loaded_at = time.time()
+    rows = api_client.get_json("table/event", params=dict(period_params(period), columns=",".join(EVENT_COLUMNS)),
+                               cache=False)
+    events = slice_period(parse_events(rows), period)
+    with _events_lock:
+        _events[period] = (loaded_at, events)
+    return events
+
+
+def _forget_events(tickid):
+    with _events_lock:
+        _events.clear()
+
+
+api_client.on_tick(_forget_events)
+
+
+def _journal(raw):
+    if isinstance(raw, dict):
+        return raw
+    try:
+        payload = json.loads(raw)
+    except (TypeError, ValueError):
+        try:
+            payload = ast.literal_eval(raw)
+        except Exception:
+            return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _influence(payload):
+    # MissionCompleted: [(faction, number of "+" over all systems)]
+    effects = []
+    for effect in payload.get("FactionEffects") or []:
+        plus = sum(str(i.get("Influence", "")).count("+") for i in effect.get("Influence") or [])
+        if effect.get("Faction") and plus:
+            effects.append((effect["Faction"], plus))
+    return effects
+
+
+def parse_events(rows):
+    """One row per relevant event: cmdr, kind (event, RedeemVoucher split by type), amounts and influence"""
+    records = []
+    for row in rows:
+        event = row.get("event")
+        if event not in JOURNAL_EVENTS:
+            continue
+        payload = _journal(row.get("raw_json")) if JOURNAL_EVENTS[event] else {}
+        record = {field: payload.get(field) for field in AMOUNT_FIELDS}
+        record["cmdr"] = row.get("cmdr") or payload.get("Commander")
+        record["timestamp"] = row.get("timestamp") or payload.get("timestamp")
+        record["kind"] = f"{event}:{str(payload.get('Type', '')).lower()}" if event == "RedeemVoucher" else event
+        record["influence"] = _influence(payload) if event == "MissionCompleted" else None
+        records.append(record)
+    df = pd.DataFrame.from_records(records, columns=["cmdr", "timestamp", "kind", "influence"] + AMOUNT_FIELDS)
+    df[AMOUNT_FIELDS] = df[AMOUNT_FIELDS].apply(pd.to_numeric, errors="coerce").fillna(0).astype("int64")
+    df = df[df["cmdr"].notna()].astype({"cmdr": "category", "kind": "category"})
+    return time_index(df, "timestamp")
+
+
+def summarize(events, top=None):
+    """Compute every summary from the event frame; top keeps only the N largest rows of each"""
+    totals = events.groupby(["cmdr", "kind"], observed=True)[AMOUNT_FIELDS].sum()
+    totals["events"] = events.groupby(["cmdr", "kind"], observed=True).size()
+    wide = totals.unstack("kind", fill_value=0)
+
+    def col(field, kind):
+        return wide[(field, kind)] if (field, kind) in wide.columns else pd.Series(0, index=wide.index)
+
+    buy, sell = col("TotalCost", "MarketBuy"), col("TotalSale", "MarketSell")
+    exploration = (col("TotalEarnings", "MultiSellExplorationData") + col("TotalEarnings", "SellExplorationData")
+                   + col("BaseValue", "SellExplorationData") + col("Bonus", "SellExplorationData"))
+    summaries = {
+        "market-events": pd.DataFrame({
+            "total_buy": buy,
+            "total_sell": sell,
+            "total_transaction_volume": buy + sell,
+            "total_trade_quantity": col("Count", "MarketBuy") + col("Count", "MarketSell"),
+        }),
+        "missions-completed": col("events", "MissionCompleted").rename("missions_completed").to_frame(),
+        "missions-failed": col("events", "MissionFailed").rename("missions_failed").to_frame(),
+        "bounty-vouchers": col("Amount", "RedeemVoucher:bounty").rename("bounty_vouchers").to_frame(),
+        "combat-bonds": col("Amount", "RedeemVoucher:combatbond").rename("combat_bonds").to_frame(),
+        # Older journals report BaseValue + Bonus instead of TotalEarnings
+        "exploration-sales": exploration.rename("total_exploration_sales").to_frame(),
+        "bounty-fines": (col("Fine", "CommitCrime") + col("Bounty", "CommitCrime")).rename("bounty_fines").to_frame(),
+    }
+
+    # Positional, the time index has duplicates
+    effects = pd.Series(events["influence"].to_numpy()).dropna().explode().dropna()
+    influence = pd.DataFrame({
+        "cmdr": events["cmdr"].astype(str).to_numpy()[effects.index.to_numpy(dtype=int)],
+        "faction_name": [effect[0] for effect in effects],
+        "influence": [effect[1] for effect in effects],
+    })
+    by_faction = influence.groupby(["cmdr", "faction_name"], as_index=False)["influence"].sum()
+    summaries["influence-by-faction"] = by_faction
+    summaries["influence-eic"] = by_faction[by_faction["faction_name"] == EIC_FACTION]
+
+    result = {}
+    for name, df in summaries.items():
+        if "cmdr" not in df.columns:
+            df = df.rename_axis("cmdr").reset_index()
+            df["cmdr"] = df["cmdr"].astype(str)
+        metric = df.columns[-1] if name != "market-events" else "total_transaction_volume"
+        df = df[df[metric] > 0]
+        # nlargest only partially sorts for Top N
+        df = df.nlargest(top, metric) if top else df.sort_values(metric, ascending=False, kind="stable")
+        result[name] = df.to_dict("records")
+    return result
@@ -1,6 +1,21 @@
 import requests
+import contextvars
+import itertools
 import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from urllib.parse import urlencode
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import api_metrics
+from circuit_breaker import CircuitBreaker
+from response_cache import CacheEntry, ResponseCache
+from response_store import ResponseStore
+from singleflight import SingleFlight
 
 load_dotenv()
 
@@ -14,45 +29,544 @@ API_BASE = os.getenv("API_BASE")
 API_KEY = os.getenv("API_KEY")
 API_VERSION = os.getenv("API_VERSION")
 
-def get_json(path, params=None):
-    url = f"{API_BASE}/{path}"
+# Connection pool settings (one pool per process, shared by all sessions)
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+GET_RETRIES = int(os.getenv("API_GET_RETRIES", "3"))
+RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+
+# Default (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (
+    float(os.getenv("API_CONNECT_TIMEOUT", "3.05")),
+    float(os.getenv("API_READ_TIMEOUT", "30")),
+)
+
+# Per-endpoint (connect, read) timeouts, matched by longest path prefix
+ENDPOINT_TIMEOUTS = {
+    "login": (DEFAULT_TIMEOUT[0], 15),
+    "table/": (DEFAULT_TIMEOUT[0], 120),
+    "summary/": (DEFAULT_TIMEOUT[0], 60),
+    "summary/discord/": (DEFAULT_TIMEOUT[0], 60),
+    "syntheticcz-summary": (DEFAULT_TIMEOUT[0], 60),
+    "syntheticgroundcz-summary": (DEFAULT_TIMEOUT[0], 60),
+    "sync/": (DEFAULT_TIMEOUT[0], 120),
+}
+
+# Max. concurrent requests of a single fetch_many() fan-out
+FANOUT_WORKERS = int(os.getenv("API_FANOUT_WORKERS", "6"))
+
+# Background workers that warm the cache via prefetch()
+PREFETCH_WORKERS = int(os.getenv("API_PREFETCH_WORKERS", "2"))
+
+# Response cache: per-endpoint TTLs in seconds, matched by longest path prefix.
+# A TTL of 0 disables caching for that endpoint.
+CACHE_MAX_BYTES = int(float(os.getenv("API_CACHE_MAX_MB", "256")) * 1024 * 1024)
+DEFAULT_CACHE_TTL = int(os.getenv("API_CACHE_TTL", "60"))
+CACHE_TTLS = {
+    "summary/": 300,
+    "syntheticcz-summary": 300,
+    "syntheticgroundcz-summary": 300,
+    "bounty-vouchers": 300,
+    "table/": 120,
+    "systems/": 60,
+    "objectives": 30,
+    "factions": 30,
+}
+
+# Optional persistent response store (SQLite file), read through on startup.
+# Entries loaded from disk are served immediately if younger than
+# CACHE_DB_MAX_STALE seconds and refreshed in the background once expired.
+CACHE_DB = os.getenv("API_CACHE_DB")
+CACHE_DB_MAX_BYTES = int(float(os.getenv("API_CACHE_DB_MAX_MB", "512")) * 1024 * 1024)
+CACHE_DB_MAX_STALE = int(os.getenv("API_CACHE_DB_MAX_STALE", "86400"))
+# Seconds an expired entry keeps being served while its background refresh runs
+REFRESH_GRACE = 30
+
+# Stale-while-revalidate: an expired payload is revalidated for at most
+# API_STALE_WAIT seconds; if the API is slower, fails or the circuit is open,
+# the last good payload (up to API_STALE_MAX_AGE seconds old) is served instead
+STALE_WAIT = float(os.getenv("API_STALE_WAIT", "3"))
+STALE_MAX_AGE = int(os.getenv("API_STALE_MAX_AGE", "86400"))
+
+# A second, identical GET is sent when the first is slower than the
+# API_HEDGE_PERCENTILE of the endpoint's recorded latency (at least
+# API_HEDGE_MIN seconds, and only after API_HEDGE_MIN_SAMPLES requests).
+# API_HEDGE_AFTER sets a fixed threshold instead (0 disables). Only page
+# requests are hedged, never background refreshes, prefetches or the warmer.
+HEDGE_AFTER = float(os.getenv("API_HEDGE_AFTER")) if os.getenv("API_HEDGE_AFTER") else None
+HEDGE_PERCENTILE = float(os.getenv("API_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN = float(os.getenv("API_HEDGE_MIN", "0.5"))
+HEDGE_MIN_SAMPLES = int(os.getenv("API_HEDGE_MIN_SAMPLES", "20"))
+# Large downloads and the summaries, which are slow because of the work they
+# do on the server, are never hedged
+NO_HEDGE_PREFIXES = ("table/", "sync/", "summary/", "bounty-vouchers", "syntheticcz-summary",
+                     "syntheticgroundcz-summary")
+
+# Circuit breaker: open after this many consecutive failures (connection
+# errors, timeouts, HTTP 5xx), try again after API_BREAKER_RESET seconds
+BREAKER_FAILURES = int(os.getenv("API_BREAKER_FAILURES", "5"))
+BREAKER_RESET = int(os.getenv("API_BREAKER_RESET", "30"))
+
+_session = None
+_session_lock = threading.Lock()
+
+_cache = ResponseCache(CACHE_MAX_BYTES)
+
+# Payloads too large for the memory cache are not stored either: they would be
+# decompressed and parsed from disk on every memory miss
+_store = ResponseStore(CACHE_DB, CACHE_DB_MAX_BYTES, CACHE_MAX_BYTES) if CACHE_DB else None
+
+# Identical GETs in flight at the same time share one HTTP call
+_flight = SingleFlight()
+
+# Small pool for background refreshes and persistence writes
+_background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="api-background")
+
+# Revalidations a page waits for at most STALE_WAIT seconds, and hedged GETs
+_revalidate = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-revalidate")
+_hedge = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="api-hedge")
+# Pending revalidation per cache key, so waiting pages share one pool slot
+_revalidating = {}
+_revalidating_lock = threading.Lock()
+
+_breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+
+# Stale payloads served during the current script run: [(path, age in s, reason)]
+_stale_served = contextvars.ContextVar("stale_served", default=None)
+
+# Prefetch queue: (priority, order, path), drained by PREFETCH_WORKERS daemon threads
+_prefetch_queue = queue.PriorityQueue()
+_prefetch_pending = set()
+_prefetch_workers = []
+_prefetch_order = itertools.count()
+_prefetch_lock = threading.Lock()
+_prefetch_counters = {"queued": 0, "fetched": 0, "failed": 0}
+
+# Latest BGS tick seen in any payload, and the timestamp of the row it came from
+_tick = {"tickid": None, "timestamp": None}
+_tick_lock = threading.Lock()
+_tick_listeners = []
+
+def get_session():
+    """Return the process-wide keep-alive session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # Only idempotent methods are retried, with exponential backoff
+                retry = Retry(
+                    total=GET_RETRIES,
+                    connect=GET_RETRIES,
+                    read=GET_RETRIES,
+                    status=GET_RETRIES,
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"GET", "HEAD"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_SIZE,
+                    pool_maxsize=POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def _match_prefix(table, path, default):
+    path = path.lstrip("/")
+    matches = [prefix for prefix in table if path.startswith(prefix)]
+    if not matches:
+        return default
+    return table[max(matches, key=len)]
+
+def get_timeout(path):
+    """Get the (connect, read) timeout configured for an API path"""
+    return _match_prefix(ENDPOINT_TIMEOUTS, path, DEFAULT_TIMEOUT)
+
+def get_cache_ttl(path):
+    """Get the cache TTL in seconds configured for an API path"""
+    return _match_prefix(CACHE_TTLS, path, DEFAULT_CACHE_TTL)
+
+def cache_key(path, params=None):
+    """Stable cache key for a path plus query parameters"""
+    if not params:
+        return path
+    separator = "&" if "?" in path else "?"
+    return f"{path}{separator}{urlencode(sorted(params.items()), doseq=True)}"
+
+def _headers(extra=None):
     headers = {
         "apikey": API_KEY,
         "apiversion": API_VERSION
     }
-    r = requests.get(url, headers=headers, params=params)
+    if extra:
+        headers.update(extra)
+    return headers
+
+class CircuitOpenError(requests.ConnectionError):
+    """The API failed repeatedly; requests are not sent until the circuit closes again"""
+
+def _invalidate_for(path):
+    # Writes invalidate every cached read under the same top-level resource
+    clear_cache(path.lstrip("/").split("/")[0].split("?")[0])
+
+def request(method, path, headers=None, timeout=None, **kwargs):
+    """Send a request through the shared session and return the raw response"""
+    if not _breaker.allow():
+        raise CircuitOpenError(f"API unavailable, circuit open (retry in up to {BREAKER_RESET}s)")
+    url = f"{API_BASE}/{path}"
+    started = time.perf_counter()
+    r = None
+    try:
+        r = get_session().request(
+            method,
+            url,
+            headers=_headers(headers),
+            timeout=timeout or get_timeout(path),
+            **kwargs
+        )
+    finally:
+        # Every allowed call is counted and ends in success() or failure(), whatever
+        # it raised; otherwise a half-open trial never ends and the circuit stays shut
+        api_metrics.record_request(path, time.perf_counter() - started, len(r.content) if r is not None else 0,
+                                   error=r is None or r.status_code >= 400)
+        if r is not None and r.status_code < 500:
+            _breaker.success()
+        else:
+            _breaker.failure()
+    if method.upper() not in ("GET", "HEAD") and r.ok:
+        _invalidate_for(path)
+    return r
+
+def decode_json(r, path):
+    """r.json(), with the decode time recorded for the endpoint"""
+    started = time.perf_counter()
+    payload = r.json()
+    api_metrics.record_decode(path, time.perf_counter() - started)
+    return payload
+
+def get_json(path, params=None, cache=True, hedge=True):
+    """GET a JSON payload, served from the shared response cache when fresh.
+
+    Concurrent identical requests are coalesced into one HTTP call.
+    Cached payloads are shared between all sessions and must not be mutated.
+    Background callers pass hedge=False.
+    """
+    ttl = get_cache_ttl(path)
+    key = cache_key(path, params)
+    if not cache or ttl <= 0:
+        return _flight.do(("uncached", key), lambda: _fetch(path, params, hedge))
+
+    entry = _cache.get(key)
+    if entry is None and _store is not None:
+        entry = _load_from_store(key, path, params, ttl)
+    if entry is not None and entry.is_fresh():
+        _cache.record("hits")
+        return entry.value
+    if entry is None or entry.age > STALE_MAX_AGE:
+        return _flight.do(key, lambda: _fetch_cached(key, path, params, ttl, hedge))
+    return _revalidate_or_stale(key, path, params, ttl, entry)
+
+def _revalidate_or_stale(key, path, params, ttl, entry):
+    # The revalidation keeps running in the background when the page stops waiting
+    if _breaker.is_open():
+        reason = "API unavailable"
+    else:
+        future = _revalidation(key, path, params, ttl)
+        try:
+            return future.result(timeout=STALE_WAIT)
+        except FutureTimeoutError:
+            reason = "API slow"
+        except Exception as e:
+            reason = f"API error: {e}"
+    _cache.record("stale")
+    served = _stale_served.get()
+    if served is not None:
+        served.append((cache_key(path, params), entry.age, reason))
+    return entry.value
+
+def _revalidation(key, path, params, ttl):
+    # At most one queued or running revalidation per key
+    with _revalidating_lock:
+        future = _revalidating.get(key)
+        if future is not None:
+            return future
+        future = _revalidating[key] = _revalidate.submit(
+            _flight.do, key, lambda: _fetch_cached(key, path, params, ttl))
+    future.add_done_callback(lambda done: _revalidation_done(key, done))
+    return future
+
+def _revalidation_done(key, future):
+    with _revalidating_lock:
+        if _revalidating.get(key) is future:
+            del _revalidating[key]
+
+def track_stale():
+    """Start collecting the stale payloads served to the current script run"""
+    _stale_served.set([])
+
+def stale_payloads():
+    """[(path, age in seconds, reason)] of stale payloads served since track_stale()"""
+    return list(_stale_served.get() or [])
+
+def _load_from_store(key, path, params, ttl):
+    # Warm start: promote the on-disk copy into memory. An expired copy is still
+    # served right away and refreshed in the background.
+    try:
+        entry = _store.load(key)
+    except Exception:
+        return None
+    if entry is None or entry.age > CACHE_DB_MAX_STALE:
+        return None
+    _cache.put(key, entry)
+    _cache.record("restored")
+    if not entry.is_fresh():
+        _background.submit(_refresh, key, path, params, ttl)
+        entry.grace_until = time.time() + min(entry.ttl, REFRESH_GRACE)
+    return entry
+
+def _refresh(key, path, params, ttl):
+    try:
+        _flight.do(key, lambda: _fetch_cached(key, path, params, ttl))
+    except Exception:
+        pass
+
+def _hedge_after(path):
+    # Seconds until a GET of path is hedged, 0 for never
+    if path.lstrip("/").startswith(NO_HEDGE_PREFIXES):
+        return 0
+    if HEDGE_AFTER is not None:
+        return HEDGE_AFTER
+    latency = api_metrics.latency_percentile(path, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+    return max(latency, HEDGE_MIN) if latency is not None else 0
+
+def _get(path, params=None, headers=None, hedge=False):
+    # Hedged GET: a second request once the first is unusually slow, the first good answer wins
+    hedge_after = _hedge_after(path) if hedge else 0
+    if hedge_after <= 0:
+        return request("GET", path, params=params, headers=headers)
+    first = _hedge.submit(request, "GET", path, params=params, headers=headers)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeoutError:
+        pass
+    _cache.record("hedged")
+    pending = {first, _hedge.submit(request, "GET", path, params=params, headers=headers)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+def _fetch(path, params, hedge=False):
+    r = _get(path, params=params, hedge=hedge)
+    r.raise_for_status()
+    payload = decode_json(r, path)
+    note_tick(payload)
+    return payload
+
+def _fetch_cached(key, path, params, ttl, hedge=False):
+    # Stale entries are revalidated, so an unchanged payload only costs a 304
+    entry = _cache.get(key)
+    r = _get(path, params=params, headers=entry.validators() if entry else None, hedge=hedge)
+    if r.status_code == 304 and entry is not None:
+        _cache.touch(key)
+        _cache.record("revalidated")
+        if _store is not None:
+            _background.submit(_store.touch, key)
+        return entry.value
     r.raise_for_status()
-    return r.json()
+    payload = decode_json(r, path)
+    _cache.record("misses")
+    entry = CacheEntry(
+        payload,
+        len(r.content),
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+        ttl=ttl
+    )
+    _cache.put(key, entry)
+    if _store is not None:
+        _background.submit(_store.save, key, entry, r.content)
+    note_tick(payload)
+    return payload
+
+def refresh(path, params=None):
+    """Fetch path into the response cache now, revalidating a cached copy.
+
+    Blocks until the API answered: no stale payload and no hedging, for
+    background jobs like the cache warmer that must not outrun the API.
+    """
+    ttl = get_cache_ttl(path)
+    key = cache_key(path, params)
+    return _flight.do(key, lambda: _fetch_cached(key, path, params, ttl))
+
+def fetch_many(paths, max_workers=None):
+    """GET several JSON payloads concurrently.
+
+    paths maps a caller-chosen key to an API path. Yields (key, payload, error)
+    tuples in completion order; a failing path yields its exception instead of
+    aborting the others.
+    """
+    if not paths:
+        return
+    workers = min(max_workers or FANOUT_WORKERS, len(paths))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-fanout") as executor:
+        # Each worker shares the caller's context, so stale payloads are reported to it
+        futures = {executor.submit(contextvars.copy_context().run, get_json, path): key
+                   for key, path in paths.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+def prefetch(paths, priority=0):
+    """Warm the response cache for API paths in the background.
+
+    Paths are fetched by a small pool of worker threads, lower priority
+    values first. Paths that are cached and fresh or already queued are
+    skipped. Errors are ignored; the page's own get_json() reports them.
+    """
+    with _prefetch_lock:
+        for path in paths:
+            entry = _cache.get(cache_key(path))
+            if path in _prefetch_pending or (entry is not None and entry.is_fresh()):
+                continue
+            _prefetch_pending.add(path)
+            _prefetch_queue.put((priority, next(_prefetch_order), path))
+            _prefetch_counters["queued"] += 1
+        while len(_prefetch_workers) < min(PREFETCH_WORKERS, len(_prefetch_pending)):
+            worker = threading.Thread(target=_prefetch_worker, name=f"api-prefetch-{len(_prefetch_workers)}",
+                                      daemon=True)
+            _prefetch_workers.append(worker)
+            worker.start()
+
+def _prefetch_worker():
+    while True:
+        _, _, path = _prefetch_queue.get()
+        try:
+            get_json(path, hedge=False)
+            counter = "fetched"
+        except Exception:
+            counter = "failed"
+        with _prefetch_lock:
+            _prefetch_pending.discard(path)
+            _prefetch_counters[counter] += 1
+
+def prefetch_stats():
+    """Counters of the background prefetch queue"""
+    with _prefetch_lock:
+        stats = dict(_prefetch_counters)
+        stats["pending"] = len(_prefetch_pending)
+        stats["workers"] = len(_prefetch_workers)
+    return stats
+
+def query_table(table, filters=None, page=1, limit=None, columns=None):
+    """Query table/<name> with filters, pagination and column projection pushed down to the API.
+
+    Returns (rows, total). total comes from the X-Total-Count header and is None
+    when the API does not support the query parameters, in which case rows is
+    the complete, unfiltered table.
+    """
+    params = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+    if limit:
+        params["page"] = page
+        params["limit"] = limit
+    if columns:
+        params["columns"] = ",".join(columns)
+    path = f"table/{table}"
+
+    def fetch():
+        r = request("GET", path, params=params)
+        r.raise_for_status()
+        return r
+
+    r = _flight.do(("query", cache_key(path, params)), fetch)
+    rows = decode_json(r, path)
+    note_tick(rows)
+    total = r.headers.get("X-Total-Count")
+    return rows, int(total) if total is not None else None
 
 def post_json(path, json_data=None):
-    url = f"{API_BASE}/{path}"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.post(url, headers=headers, json=json_data)
+    r = request("POST", path, json=json_data)
     r.raise_for_status()
     return r.status_code
 
 def put_json(path, json_data=None):
-    url = f"{API_BASE}/{path}"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.put(url, headers=headers, json=json_data)
+    r = request("PUT", path, json=json_data)
     r.raise_for_status()
-    return r.json()
+    return decode_json(r, path)
 
 def delete_request(path):
-    url = f"{API_BASE}/{path}"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.delete(url, headers=headers)
+    r = request("DELETE", path)
     r.raise_for_status()
-    return r.json()
+    return decode_json(r, path)
+
+def note_tick(payload):
+    """Track the newest BGS tick in a payload and expire the cache when it changes"""
+    if not isinstance(payload, list) or not payload:
+        return
+    # Tables come back ordered by id, so the newest row is at one of the ends
+    rows = [row for row in (payload[0], payload[-1]) if isinstance(row, dict) and row.get("tickid")]
+    if not rows:
+        return
+    newest = max(rows, key=lambda row: str(row.get("timestamp") or ""))
+    tickid, timestamp = newest["tickid"], str(newest.get("timestamp") or "")
+    with _tick_lock:
+        if tickid == _tick["tickid"]:
+            return
+        # Only move forward in time: older payloads must not roll the tick back
+        if _tick["timestamp"] and timestamp <= _tick["timestamp"]:
+            return
+        changed = _tick["tickid"] is not None
+        _tick["tickid"], _tick["timestamp"] = tickid, timestamp
+    if changed:
+        _cache.expire_all()
+        for listener in list(_tick_listeners):
+            listener(tickid)
+
+def on_tick(listener):
+    """Call listener(tickid) whenever a new BGS tick shows up in a payload"""
+    _tick_listeners.append(listener)
+
+def current_tick():
+    """The newest BGS tick id seen so far (None before the first tick-bearing payload)"""
+    return _tick["tickid"]
+
+def cache_state(path, params=None):
+    """"fresh" or "stale" if a GET is in the response cache, else None"""
+    entry = _cache.get(cache_key(path, params))
+    if entry is None:
+        return None
+    return "fresh" if entry.is_fresh() else "stale"
+
+def cache_stats():
+    """Hit/miss/revalidation counters and size of the shared response cache"""
+    return _cache.stats()
+
+def breaker_stats():
+    """State and counters of the API circuit breaker"""
+    return _breaker.stats()
+
+def singleflight_stats():
+    """How many GETs were executed vs. coalesced into an identical in-flight call"""
+    return _flight.stats()
+
+def clear_cache(prefix=""):
+    """Drop cached responses whose key starts with prefix (all by default)"""
+    _cache.invalidate(prefix)
+    if _store is not None:
+        _store.delete(prefix)
+
+def store_stats():
+    """Size of the persistent response store, or None when it is disabled"""
+    return _store.stats() if _store is not None else None
 
 # Faction Management API functions
 def get_factions():
@@ -71,34 +585,15 @@ def add_faction(name, description="Custom faction"):
         "description": description,
         "timestamp": datetime.utcnow().isoformat()
     }
-    url = f"{API_BASE}/factions"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.post(url, headers=headers, json=data)
+    r = request("POST", "factions", json=data)
     r.raise_for_status()
-    return r.json()
+    return decode_json(r, "factions")
 
 def update_faction(faction_name, description):
     """Update a faction's description"""
     data = {"description": description}
-    url = f"{API_BASE}/factions/{faction_name}"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.put(url, headers=headers, json=data)
-    r.raise_for_status()
-    return r.json()
+    return put_json(f"factions/{faction_name}", data)
 
 def delete_faction(faction_name):
     """Delete a faction"""
-    url = f"{API_BASE}/factions/{faction_name}"
-    headers = {
-        "apikey": API_KEY,
-        "apiversion": API_VERSION
-    }
-    r = requests.delete(url, headers=headers)
-    r.raise_for_status()
-    return r.json()
\ No newline at end of file
+    return delete_request(f"factions/{faction_name}")
@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+from collections import deque
+
+# Latest samples kept per endpoint and page for the percentiles
+SAMPLES = int(os.getenv("API_METRICS_SAMPLES", "1000"))
+
+# Variable path segments folded into one endpoint name
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^systems/[^/]+/"), "systems/<name>/"),
+    (re.compile(r"^factions/[^/]+$"), "factions/<name>"),
+]
+
+_lock = threading.Lock()
+_endpoints = {}
+_pages = {}
+
+
+def endpoint_name(path):
+    """Path without query string and with variable segments replaced"""
+    name = path.lstrip("/").split("?")[0]
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        name = pattern.sub(replacement, name)
+    return name
+
+
+def _endpoint(name):
+    entry = _endpoints.get(name)
+    if entry is None:
+        entry = _endpoints[name] = {
+            "requests": 0,
+            "errors": 0,
+            "bytes": 0,
+            "latency": deque(maxlen=SAMPLES),
+            "decode": deque(maxlen=SAMPLES),
+        }
+    return entry
+
+
+def record_request(path, seconds, size=0, error=False):
+    """One HTTP request: latency, response bytes and whether it failed"""
+    with _lock:
+        entry = _endpoint(endpoint_name(path))
+        entry["requests"] += 1
+        entry["errors"] += bool(error)
+        entry["bytes"] += size
+        entry["latency"].append(seconds)
+
+
+def record_decode(path, seconds):
+    """Time spent parsing one JSON response"""
+    with _lock:
+        _endpoint(endpoint_name(path))["decode"].append(seconds)
+
+
+def record_page(page, seconds):
+    """Render time of one page run"""
+    with _lock:
+        _pages.setdefault(page, deque(maxlen=SAMPLES)).append(seconds)
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile (q in 0-100) of a sequence, None if empty"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def latency_percentile(path, q, min_samples=1):
+    """Recorded latency percentile (seconds) of the endpoint of path, None below min_samples"""
+    with _lock:
+        entry = _endpoints.get(endpoint_name(path))
+        samples = list(entry["latency"]) if entry else []
+    return percentile(samples, q) if len(samples) >= min_samples else None
+
+
+def endpoint_report():
+    """Per endpoint: requests, error rate, latency p50/p95/p99 and decode p50 (ms), bytes"""
+    with _lock:
+        entries = {name: dict(entry, latency=list(entry["latency"]), decode=list(entry["decode"]))
+                   for name, entry in _endpoints.items()}
+    report = {}
+    for name, entry in entries.items():
+        latency = entry["latency"]
+        report[name] = {
+            "requests": entry["requests"],
+            "errors": entry["errors"],
+            "error_rate": entry["errors"] / entry["requests"] if entry["requests"] else 0.0,
+            "p50_ms": _ms(percentile(latency, 50)),
+            "p95_ms": _ms(percentile(latency, 95)),
+            "p99_ms": _ms(percentile(latency, 99)),
+            "decode_p50_ms": _ms(percentile(entry["decode"], 50)),
+            "bytes": entry["bytes"],
+            "avg_bytes": entry["bytes"] / entry["requests"] if entry["requests"] else 0,
+        }
+    return report
+
+
+def page_report():
+    """Per page: runs and render time p50/p95/max (ms)"""
+    with _lock:
+        pages = {page: list(samples) for page, samples in _pages.items()}
+    return {
+        page: {
+            "runs": len(samples),
+            "p50_ms": _ms(percentile(samples, 50)),
+            "p95_ms": _ms(percentile(samples, 95)),
+            "max_ms": _ms(max(samples)),
+        }
+        for page, samples in pages.items()
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
@@ -1,8 +1,15 @@
+import time
 import streamlit as st
+import api_client
+import api_metrics
+import warmer
 from auth import verify_user
 
 st.set_page_config(page_title="Sinistra", layout="wide")
 
+# Cache nach jedem Tick im Hintergrund vorwärmen (einmal pro Prozess)
+warmer.start()
+
 # Sinistra Theme: Red, Orange, Yellow, Light Blue
 st.markdown("""
     <style>
@@ -154,6 +161,7 @@ with st.sidebar:
     # Add admin-only pages
     if st.session_state.user.get("is_admin"):
         menu_items.append("🏛️ Faction Management")
+        menu_items.append("🩺 API Status")
     
     page = st.radio(
         "📂 Menu",
@@ -161,34 +169,67 @@ with st.sidebar:
         index=3
     )
 
-# Seitenlogik
-if page == "📊 Table Viewer":
-    from pages import view_table
-    view_table.render()
-elif page == "📈 Evaluations":
-    from pages import evaluations
-    evaluations.render()
-elif page == "🌌 Systems":
-    from pages import systems
-    systems.render()
-elif page == "🧑 Cmdrs":
-    from pages import cmdrs
-    cmdrs.render()
-elif page == "🏆 Leaderboard":
-    from pages import leaderboard
-    leaderboard.render()
-elif page == "🎯 Objectives":
-    from pages import objectives
-    objectives.render()
-elif page == "🆕 Recruits":
-    from pages import recruits
-    recruits.render()
-elif page == "🪙 Redeem Vouchers":
-    from pages import redeem_vouchers
-    redeem_vouchers.render()
-elif page == "⚔️ CZ Summary":
-    from pages import cz_summary
-    cz_summary.main()
-elif page == "🏛️ Faction Management":
-    from pages import faction_management
-    faction_management.render()
+    # Perioden lokal aus einem Datensatz schneiden statt pro Periode neu zu laden
+    st.toggle("⚡ Slice periods locally", key="slice_periods",
+              help="Load the widest period once and derive the others in the dashboard "
+                   "(Redeem Vouchers)")
+
+# Hinweis, falls die Seite wegen API-Problemen zwischengespeicherte Daten zeigt
+stale_notice = st.empty()
+api_client.track_stale()
+page_started = time.perf_counter()
+
+# Seitenlogik; st.stop()/st.rerun() und Fehler beenden die Seite ebenfalls
+try:
+    if page == "📊 Table Viewer":
+        from pages import view_table
+        view_table.render()
+    elif page == "📈 Evaluations":
+        from pages import evaluations
+        evaluations.render()
+    elif page == "🌌 Systems":
+        from pages import systems
+        systems.render()
+    elif page == "🧑 Cmdrs":
+        from pages import cmdrs
+        cmdrs.render()
+    elif page == "🏆 Leaderboard":
+        from pages import leaderboard
+        leaderboard.render()
+    elif page == "🎯 Objectives":
+        from pages import objectives
+        objectives.render()
+    elif page == "🆕 Recruits":
+        from pages import recruits
+        recruits.render()
+    elif page == "🪙 Redeem Vouchers":
+        from pages import redeem_vouchers
+        redeem_vouchers.render()
+    elif page == "⚔️ CZ Summary":
+        from pages import cz_summary
+        cz_summary.main()
+    elif page == "🏛️ Faction Management":
+        from pages import faction_management
+        faction_management.render()
+    elif page == "🩺 API Status":
+        from pages import api_status
+        api_status.render()
+finally:
+    api_metrics.record_page(page, time.perf_counter() - page_started)
+    stale = api_client.stale_payloads()
+    if stale:
+        oldest = max(age for _, age, _ in stale)
+        stale_notice.warning(
+            f"⚠️ {stale[0][2]}: showing cached data up to {int(oldest // 60)} min old "
+            f"for {len(stale)} request(s), refreshed in the background."
+        )
+
+# Speicherersparnis der kompakten DataFrames (nur für Admins)
+if st.session_state.user.get("is_admin"):
+    from frames import memory_report
+    report = memory_report()
+    if report:
+        with st.sidebar.expander("🧠 DataFrame memory"):
+            for name, entry in report.items():
+                st.caption(f"{name}: {entry['rows']} rows, "
+                           f"{entry['after'] / 2**20:.1f} MB (saved {entry['saved'] / 2**20:.1f} MB)")
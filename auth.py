@@ -1,18 +1,10 @@
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_BASE = os.getenv("API_BASE")
-API_KEY = os.getenv("API_KEY")
+from api_client import decode_json, request
 
 def verify_user(username, password):
     try:
-        headers = {"apikey": API_KEY}
-        r = requests.post(f"{API_BASE}/login", json={"username": username, "password": password}, headers=headers)
+        r = request("POST", "login", json={"username": username, "password": password})
         if r.status_code == 200:
-            return r.json()
+            return decode_json(r, "login")
         else:
             print(r.status_code)
             print(r.text)
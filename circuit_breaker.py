@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Stop calling a failing backend for a while.
+
+    After ``failures`` consecutive failures the circuit opens and allow()
+    returns False for ``reset_after`` seconds. Then one trial call is let
+    through (half-open): a success closes the circuit, a failure opens it
+    again.
+    """
+
+    def __init__(self, failures, reset_after):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+        self._counters = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """True if a call may go to the backend now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and time.time() - self._opened_at >= self.reset_after:
+                self._trial = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None and time.time() - self._opened_at < self.reset_after
+
+    def success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._trial or (self._opened_at is None and self._consecutive >= self.failures):
+                if self._opened_at is None:
+                    self._counters["opened"] += 1
+                self._opened_at = time.time()
+            self._trial = False
+
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.time() - self._opened_at >= self.reset_after else "open"
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["consecutive_failures"] = self._consecutive
+        stats["state"] = self.state()
+        return stats
@@ -0,0 +1,122 @@
+import threading
+
+import pandas as pd
+from pandas.api.types import (
+    infer_dtype,
+    is_bool_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_object_dtype,
+)
+
+# Columns known to repeat a handful of values across large frames
+CATEGORICAL_COLUMNS = {
+    "cmdr", "event", "tickid", "starsystem", "system", "faction", "faction_name",
+    "awarding_faction", "victim_faction", "cz_type", "settlement", "squadron_rank",
+    "type",
+}
+# Other string columns become categorical when they have at most this share
+# of distinct values
+MAX_UNIQUE_RATIO = 0.5
+# Below this many rows the categorical overhead outweighs the savings
+MIN_ROWS = 50
+
+_INT32 = (-2 ** 31, 2 ** 31 - 1)
+
+_report = {}
+_report_lock = threading.Lock()
+
+
+def compact(df, categorical=None):
+    """Return a memory-compact copy of df.
+
+    Repeated strings become categoricals, int64 columns that fit are stored as
+    int32 and float64 columns are stored as float32 where that is lossless.
+    """
+    categorical = CATEGORICAL_COLUMNS if categorical is None else set(categorical)
+    converted = {}
+    for col in df.columns:
+        s = df[col]
+        if is_object_dtype(s.dtype):
+            if _is_repetitive(col, s, categorical):
+                converted[col] = s.astype("category")
+        elif is_bool_dtype(s.dtype):
+            continue
+        elif is_integer_dtype(s.dtype) and s.dtype.itemsize > 4:
+            if s.empty or (s.min() >= _INT32[0] and s.max() <= _INT32[1]):
+                converted[col] = s.astype("int32")
+        elif is_float_dtype(s.dtype) and s.dtype.itemsize > 4:
+            downcast = s.astype("float32")
+            if ((downcast.astype("float64") == s) | s.isna()).all():
+                converted[col] = downcast
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for col, values in converted.items():
+        df[col] = values
+    return df
+
+
+def _is_repetitive(col, s, categorical):
+    # Lists, dicts and mixed columns stay plain objects
+    if len(s) < MIN_ROWS or infer_dtype(s, skipna=True) != "string":
+        return False
+    return col in categorical or s.nunique() <= len(s) * MAX_UNIQUE_RATIO
+
+
+def to_frame(data, name=None, categorical=None):
+    """Build a compact DataFrame from an API payload.
+
+    With a name, the memory saved is recorded for memory_report().
+    """
+    df = pd.DataFrame(data)
+    compacted = compact(df, categorical)
+    if name:
+        record_savings(name, df, compacted)
+    return compacted
+
+
+def concat(frames):
+    """Concatenate compact frames without losing categorical dtypes"""
+    frames = [f for f in frames if not f.empty]
+    if len(frames) < 2:
+        return frames[0] if frames else pd.DataFrame()
+    frames = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        if not all(col in f.columns for f in frames):
+            continue
+        if not any(isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            continue
+        # Small batches stay object (MIN_ROWS), they join the categorical column
+        if not all(isinstance(f[col].dtype, pd.CategoricalDtype) or (
+                is_object_dtype(f[col].dtype) and infer_dtype(f[col], skipna=True) in ("string", "empty"))
+                for f in frames):
+            continue
+        for f in frames:
+            if is_object_dtype(f[col].dtype):
+                f[col] = f[col].astype("category")
+        categories = frames[0][col].cat.categories
+        for f in frames[1:]:
+            categories = categories.union(f[col].cat.categories)
+        for f in frames:
+            if not f[col].cat.categories.equals(categories):
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames)
+
+
+def record_savings(name, before, after):
+    before_bytes = int(before.memory_usage(deep=True).sum())
+    after_bytes = int(after.memory_usage(deep=True).sum())
+    with _report_lock:
+        _report[name] = {
+            "rows": len(after),
+            "before": before_bytes,
+            "after": after_bytes,
+            "saved": before_bytes - after_bytes,
+        }
+
+
+def memory_report():
+    """Bytes before/after compaction of the last frame built per name"""
+    with _report_lock:
+        return {name: dict(entry) for name, entry in _report.items()}
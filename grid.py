@@ -0,0 +1,326 @@
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+from st_aggrid import AgGrid, DataReturnMode, GridOptionsBuilder, JsCode
+
+# Number of distinct grid configurations kept in the options cache
+OPTIONS_CACHE_SIZE = int(os.getenv("GRID_OPTIONS_CACHE_SIZE", "128"))
+# From this many rows on, grids get a fixed height so AG Grid only renders
+# the visible rows
+VIRTUAL_ROWS = int(os.getenv("GRID_VIRTUAL_ROWS", "200"))
+# Rows per block sent to a server-side grid
+BLOCK_SIZE = int(os.getenv("GRID_BLOCK_SIZE", "100"))
+
+NUMBER_FORMATTER = "(value != null) ? value.toLocaleString('en-US') : ''"
+CREDITS_FORMATTER = "(value != null) ? value.toLocaleString('en-US') + ' Cr' : ''"
+
+# Column defaults and grid options of the analysis grids (grouping, pivot, side bar)
+ANALYSIS_COLUMNS = dict(
+    enableRowGroup=True,
+    enablePivot=True,
+    enableValue=True,
+    filter=True,
+    sortable=True,
+    resizable=True
+)
+ANALYSIS_GRID = dict(groupDisplayType="multipleColumns", rowGroupPanelShow="always", sideBar=True)
+
+# Grid return that only sends the filter model back instead of every row.
+# Use with data_return_mode=DataReturnMode.CUSTOM and update_on=["filterChanged"].
+FILTER_MODEL_RETURN = JsCode("""
+function(e) {
+    var api = e.eventData && e.eventData.api;
+    return {filterModel: api ? api.getFilterModel() : {}};
+}
+""")
+
+# Grid return of server-side grids: the filter and sort state, no rows
+SERVER_SIDE_RETURN = JsCode("""
+function(e) {
+    var api = e.eventData && e.eventData.api;
+    if (!api) return {};
+    var sortModel = api.getColumnState()
+        .filter(function(c) { return c.sort; })
+        .map(function(c) { return {colId: c.colId, sort: c.sort, sortIndex: c.sortIndex}; });
+    return {filterModel: api.getFilterModel(), sortModel: sortModel};
+}
+""")
+
+
+_options = OrderedDict()
+_options_lock = threading.Lock()
+_options_stats = {"hits": 0, "misses": 0}
+
+
+def grid_options(df, defaults=None, pinned=None, widths=None, numeric=(), numeric_width=None,
+                 columns=None, grid=None, side_bar=False, selection=None):
+    """Grid options for df, built once per column schema and configuration.
+
+    pinned maps columns to the fixed width of a left-pinned column, widths
+    sets plain column widths, numeric columns are right-aligned and
+    formatted with NUMBER_FORMATTER, and columns holds any other per-column
+    options. The returned dict is a copy and may be modified.
+    """
+    config = dict(defaults=defaults, pinned=pinned, widths=widths, numeric=list(numeric),
+                  numeric_width=numeric_width, columns=columns, grid=grid, side_bar=side_bar,
+                  selection=selection)
+    schema = tuple((str(col), str(dtype)) for col, dtype in df.dtypes.items())
+    key = (schema, json.dumps(config, sort_keys=True, default=str))
+    with _options_lock:
+        options = _options.get(key)
+        if options is not None:
+            _options.move_to_end(key)
+            _options_stats["hits"] += 1
+    if options is None:
+        options = _build_options(df.head(0), **config)
+        with _options_lock:
+            _options_stats["misses"] += 1
+            _options[key] = options
+            while len(_options) > OPTIONS_CACHE_SIZE:
+                _options.popitem(last=False)
+    # AgGrid modifies the options it is given
+    return copy.deepcopy(options)
+
+
+def _build_options(df, defaults, pinned, widths, numeric, numeric_width, columns, grid, side_bar, selection):
+    gb = GridOptionsBuilder.from_dataframe(df)
+    if defaults:
+        gb.configure_default_column(**defaults)
+    if side_bar:
+        gb.configure_side_bar()
+    if selection:
+        gb.configure_selection(**({"selection_mode": selection} if isinstance(selection, str) else selection))
+    if grid:
+        gb.configure_grid_options(**grid)
+    for col, width in (pinned or {}).items():
+        if col in df.columns:
+            gb.configure_column(col, width=width, pinned="left", resizable=False, minWidth=width, maxWidth=width)
+    for col, width in (widths or {}).items():
+        if col in df.columns:
+            gb.configure_column(col, width=width)
+    sizing = {"width": numeric_width, "minWidth": numeric_width} if numeric_width else {}
+    for col in numeric:
+        if col in df.columns:
+            gb.configure_column(col, type=["numericColumn", "rightAligned"], valueFormatter=NUMBER_FORMATTER, **sizing)
+    for col, options in (columns or {}).items():
+        if col in df.columns:
+            gb.configure_column(col, **options)
+    return gb.build()
+
+
+def show_grid(df, options, height=None, max_height=500, columns=None, **kwargs):
+    """Render df with AgGrid.
+
+    Only the given columns (default: all) are sent to the browser. Big
+    frames keep AG Grid's row virtualisation: the grid gets a fixed height
+    instead of growing with the rows, so only the visible rows are rendered.
+    """
+    # Copy even without pruning, AgGrid adds its own id column to the frame
+    df = df[[c for c in columns if c in df.columns]] if columns is not None else df.copy(deep=False)
+    if columns is not None:
+        options["columnDefs"] = [d for d in options.get("columnDefs", []) if d.get("field") in df.columns]
+    if len(df) >= VIRTUAL_ROWS:
+        options.pop("suppressRowVirtualisation", None)
+        options.pop("suppressColumnVirtualisation", None)
+        options.setdefault("rowBuffer", 20)
+        if options.get("domLayout") == "autoHeight":
+            options["domLayout"] = "normal"
+        height = min(height or max_height, max_height)
+    elif height is None:
+        height = min(max_height, 70 + 35 * len(df))
+    return AgGrid(df, gridOptions=options, height=height, **kwargs)
+
+
+def show_server_side_grid(df, key, block_size=BLOCK_SIZE, group_by_options=None, sum_columns=None,
+                          grid_config=None, **kwargs):
+    """Render df as a server-side grid: the browser only holds one block.
+
+    Sorting, filtering and grouping are answered by query_rows() over the
+    local DataFrame from the grid state of the previous event; the block is
+    chosen with a number input. Returns the displayed block and the full
+    query result.
+    """
+    state = server_side_state(key)
+    group_by = []
+    if group_by_options:
+        group_by = st.multiselect("Group by", group_by_options, key=f"{key}_group_by")
+    result = query_rows(df, state.get("filterModel"), state.get("sortModel"), group_by, sum_columns)
+
+    # Back to the first block whenever the query changes
+    block_key = f"{key}_block"
+    query = json.dumps([state, group_by], sort_keys=True, default=str)
+    if st.session_state.get(f"{key}_query") != query:
+        st.session_state[f"{key}_query"] = query
+        st.session_state[block_key] = 1
+    blocks = max(1, -(-len(result) // block_size))
+    st.session_state[block_key] = min(st.session_state.get(block_key, 1), blocks)
+    col1, col2 = st.columns([1, 3])
+    block = col1.number_input(f"Block (of {blocks})", min_value=1, max_value=blocks, step=1, key=block_key)
+    start = (block - 1) * block_size
+    rows = result.iloc[start:start + block_size]
+    col2.caption(f"Rows {start + 1 if len(rows) else 0}–{start + len(rows)} of {len(result)}")
+
+    config = dict(defaults=dict(filter=True, sortable=True, resizable=True))
+    config.update(grid_config or {})
+    show_grid(
+        rows,
+        grid_options(rows, **config),
+        key=key,
+        data_return_mode=DataReturnMode.CUSTOM,
+        custom_jscode_for_grid_return=SERVER_SIDE_RETURN,
+        update_on=["filterChanged", "sortChanged"],
+        **kwargs
+    )
+    return rows, result
+
+
+def server_side_state(key):
+    """Filter and sort model last reported by a server-side grid"""
+    state = st.session_state.get(key)
+    return state if isinstance(state, dict) else {}
+
+
+def query_rows(df, filter_model=None, sort_model=None, group_by=None, sum_columns=None):
+    """Answer a grid query from a local DataFrame.
+
+    With group_by, the result has one row per group with its row count and
+    the sums of sum_columns (default: all numeric columns). Filters on the
+    grouped columns apply to the groups, all other filters to the rows.
+    """
+    if group_by:
+        filter_model = filter_model or {}
+        row_filters = {k: v for k, v in filter_model.items() if k not in group_by and k != "Count"}
+        grouped = group_rows(apply_filter_model(df, row_filters), group_by, sum_columns)
+        group_filters = {k: v for k, v in filter_model.items() if k in grouped.columns and k not in row_filters}
+        df = apply_filter_model(grouped, group_filters)
+    else:
+        df = apply_filter_model(df, filter_model)
+    return apply_sort_model(df, sort_model)
+
+
+def group_rows(df, group_by, sum_columns=None):
+    """One row per group with its row count and column sums"""
+    if sum_columns is None:
+        sum_columns = df.select_dtypes("number").columns
+    sum_columns = [c for c in sum_columns if c in df.columns and c not in group_by]
+    grouped = df.groupby(group_by, observed=True, dropna=False)
+    result = grouped[sum_columns].sum() if sum_columns else pd.DataFrame(index=grouped.size().index)
+    result.insert(0, "Count", grouped.size())
+    return result.reset_index()
+
+
+def apply_sort_model(df, sort_model):
+    """Sort by an AG Grid sort model (stable, missing values last)"""
+    sort_model = [s for s in sort_model or [] if s.get("colId") in df.columns and s.get("sort")]
+    if not sort_model:
+        return df
+    sort_model.sort(key=lambda s: s.get("sortIndex") or 0)
+    return df.sort_values(
+        [s["colId"] for s in sort_model],
+        ascending=[s["sort"] != "desc" for s in sort_model],
+        kind="stable",
+        na_position="last"
+    )
+
+
+def options_cache_stats():
+    with _options_lock:
+        stats = dict(_options_stats)
+        stats["entries"] = len(_options)
+    return stats
+
+
+def apply_filter_model(df, filter_model):
+    """Apply an AG Grid filter model to the server-side DataFrame.
+
+    Supports text, number, date, set and multi filters including combined
+    conditions. Unknown filter types leave the rows unfiltered.
+    """
+    if not filter_model:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for col, model in filter_model.items():
+        if col in df.columns and model:
+            mask &= _filter_mask(df[col], model)
+    return df[mask]
+
+
+def _filter_mask(s, model):
+    if model.get("conditions"):
+        masks = [_filter_mask(s, condition) for condition in model["conditions"]]
+        combined = masks[0]
+        for m in masks[1:]:
+            combined = (combined | m) if model.get("operator") == "OR" else (combined & m)
+        return combined
+
+    filter_type = model.get("filterType")
+    kind = model.get("type")
+    if kind == "blank":
+        return s.isna() | (s.astype(str).str.strip() == "")
+    if kind == "notBlank":
+        return s.notna() & (s.astype(str).str.strip() != "")
+
+    if filter_type == "multi":
+        mask = pd.Series(True, index=s.index)
+        for sub in model.get("filterModels") or []:
+            if sub:
+                mask &= _filter_mask(s, sub)
+        return mask
+    if filter_type == "set":
+        values = model.get("values") or []
+        mask = s.astype(str).isin([str(v) for v in values if v is not None])
+        if None in values:
+            mask |= s.isna()
+        return mask
+    if filter_type == "number":
+        return _compare(pd.to_numeric(s, errors="coerce"), kind, model.get("filter"), model.get("filterTo"))
+    if filter_type == "date":
+        dates = pd.to_datetime(s, errors="coerce").dt.normalize()
+        date_from = pd.to_datetime(model.get("dateFrom")) if model.get("dateFrom") else None
+        date_to = pd.to_datetime(model.get("dateTo")) if model.get("dateTo") else None
+        if dates.dt.tz is not None:
+            date_from = date_from.tz_localize(dates.dt.tz) if date_from is not None else None
+            date_to = date_to.tz_localize(dates.dt.tz) if date_to is not None else None
+        return _compare(dates, kind, date_from, date_to)
+    if filter_type == "text":
+        text = s.astype(str).str.lower().where(s.notna(), "")
+        value = str(model.get("filter", "")).lower()
+        if kind == "contains":
+            return text.str.contains(value, regex=False)
+        if kind == "notContains":
+            return ~text.str.contains(value, regex=False)
+        if kind == "equals":
+            return text == value
+        if kind == "notEqual":
+            return text != value
+        if kind == "startsWith":
+            return text.str.startswith(value)
+        if kind == "endsWith":
+            return text.str.endswith(value)
+    return pd.Series(True, index=s.index)
+
+
+def _compare(values, kind, value, value_to=None):
+    if value is None:
+        return pd.Series(True, index=values.index)
+    if kind == "equals":
+        return values == value
+    if kind == "notEqual":
+        return values != value
+    if kind == "lessThan":
+        return values < value
+    if kind == "lessThanOrEqual":
+        return values <= value
+    if kind == "greaterThan":
+        return values > value
+    if kind == "greaterThanOrEqual":
+        return values >= value
+    if kind == "inRange" and value_to is not None:
+        # AG Grid excludes the range bounds by default
+        return (values > value) & (values < value_to)
+    return pd.Series(True, index=values.index)
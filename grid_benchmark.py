@@ -0,0 +1,93 @@
+"""Measure the server-side cost of rendering a grid by row count.
+
+For each row count this times building the grid options from scratch with
+GridOptionsBuilder versus a cached grid.grid_options() lookup, and the
+serialization AgGrid does per render (row hash and Arrow encoding) for the
+full frame versus a frame pruned to the displayed columns.
+
+Usage:
+    python grid_benchmark.py
+    python grid_benchmark.py --rows 1000 100000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from st_aggrid import GridOptionsBuilder
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+import grid
+
+DISPLAY_COLUMNS = ["No.", "Cmdr.", "Sq.-Rank", "Buy (Cr.)", "Sell (Cr.)", "Profit (Cr.)", "BVs (Cr.)",
+                   "CBs (Cr.)", "M.compl."]
+
+
+def make_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "No.": np.arange(1, rows + 1),
+        "Cmdr.": rng.choice([f"Cmdr {i}" for i in range(200)], rows),
+        "Sq.-Rank": rng.choice(["Member", "Officer", "n/a"], rows),
+    })
+    for col in DISPLAY_COLUMNS[3:]:
+        df[col] = rng.integers(0, 10 ** 9, rows)
+    # Not displayed, but shipped to the browser unless pruned
+    df["raw_json"] = ['{"event": "RedeemVoucher", "Amount": %d}' % i for i in range(rows)]
+    return df
+
+
+def build_uncached(df):
+    gb = GridOptionsBuilder.from_dataframe(df)
+    gb.configure_default_column(**grid.ANALYSIS_COLUMNS)
+    gb.configure_side_bar()
+    gb.configure_selection("single")
+    gb.configure_grid_options(**grid.ANALYSIS_GRID)
+    for col, width in [("No.", 70), ("Cmdr.", 150), ("Sq.-Rank", 140)]:
+        gb.configure_column(col, width=width, pinned="left", resizable=False, minWidth=width, maxWidth=width)
+    for col in DISPLAY_COLUMNS[3:]:
+        gb.configure_column(col, type=["numericColumn", "rightAligned"], valueFormatter=grid.NUMBER_FORMATTER)
+    return gb.build()
+
+
+def build_cached(df):
+    return grid.grid_options(df, defaults=grid.ANALYSIS_COLUMNS, side_bar=True, selection="single",
+                             grid=grid.ANALYSIS_GRID, pinned={"No.": 70, "Cmdr.": 150, "Sq.-Rank": 140},
+                             numeric=DISPLAY_COLUMNS[3:])
+
+
+def serialize(df):
+    pd.util.hash_pandas_object(df).sum()
+    return len(convert_pandas_df_to_arrow_bytes(df))
+
+
+def timed(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'options':>9} {'cached':>8} {'full ms':>9} {'full KB':>9} {'pruned ms':>10} {'pruned KB':>10}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        build_cached(df)  # warm the options cache
+        options_ms, _ = timed(lambda: build_uncached(df), args.repeat)
+        cached_ms, _ = timed(lambda: build_cached(df), args.repeat)
+        full_ms, full_bytes = timed(lambda: serialize(df), args.repeat)
+        pruned_ms, pruned_bytes = timed(lambda: serialize(df[DISPLAY_COLUMNS]), args.repeat)
+        print(f"{rows:>8} {options_ms:>8.2f}ms {cached_ms:>6.2f}ms {full_ms:>9.1f} {full_bytes / 1024:>9.0f} "
+              f"{pruned_ms:>10.1f} {pruned_bytes / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+# SQLite file with one faction snapshot per system and EDSM update (tick)
+INFLUENCE_HISTORY_DB = os.getenv("INFLUENCE_HISTORY_DB", "influence_history.db")
+# Every n-th snapshot of a system is stored in full, the others as deltas
+KEYFRAME_INTERVAL = int(os.getenv("INFLUENCE_KEYFRAME_INTERVAL", "30"))
+
+
+def faction_snapshot(edsm_data):
+    """Faction name -> [influence in 1/100000, "State, Active State, ..."] of an EDSM system"""
+    snapshot = {}
+    for faction in (edsm_data or {}).get("factions", []):
+        name = faction.get("name")
+        if not name:
+            continue
+        states = []
+        for state in faction.get("active_states") or []:
+            state = state.get("state", "") if isinstance(state, dict) else str(state)
+            if state and state not in states:
+                states.append(state)
+        main_state = faction.get("state") or ""
+        if isinstance(main_state, dict):
+            main_state = main_state.get("state", "") or main_state.get("name", "")
+        if main_state and main_state not in states:
+            states.insert(0, str(main_state))
+        snapshot[name] = [int(round((faction.get("influence") or 0) * 100000)), ", ".join(states)]
+    return snapshot
+
+
+class InfluenceHistory:
+    """Per-system faction influence/state history in SQLite.
+
+    Each snapshot is stored as a zlib-compressed JSON delta against the
+    previous snapshot of the same system: only factions whose influence or
+    state changed, and None for factions that left the system. Every
+    KEYFRAME_INTERVAL-th snapshot is stored in full.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # system -> (tick, snapshot, snapshots since the last keyframe)
+        self._last = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS influence_snapshots (
+                system TEXT NOT NULL,
+                tick TEXT NOT NULL,
+                keyframe INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                recorded_at REAL NOT NULL,
+                PRIMARY KEY (system, tick)
+            )
+        """)
+
+    def record(self, system, tick, edsm_data):
+        """Store the snapshot of edsm_data for system unless tick is already known"""
+        snapshot = faction_snapshot(edsm_data)
+        if not system or not tick or not snapshot:
+            return False
+        tick = str(tick)
+        with self._lock:
+            last = self._last.get(system) or self._load_last(system)
+            if last is not None and last[0] == tick:
+                return False
+            if self._conn.execute("SELECT 1 FROM influence_snapshots WHERE system = ? AND tick = ?",
+                                  (system, tick)).fetchone():
+                return False
+            keyframe = last is None or last[2] + 1 >= KEYFRAME_INTERVAL
+            if keyframe:
+                body, since_keyframe = snapshot, 0
+            else:
+                previous = last[1]
+                body = {name: value for name, value in snapshot.items() if previous.get(name) != value}
+                body.update({name: None for name in previous if name not in snapshot})
+                since_keyframe = last[2] + 1
+            self._conn.execute(
+                "INSERT INTO influence_snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                (system, tick, int(keyframe), zlib.compress(json.dumps(body).encode(), 6),
+                 len(json.dumps(snapshot)), time.time())
+            )
+            self._last[system] = (tick, snapshot, since_keyframe)
+        return True
+
+    def _load_last(self, system):
+        snapshots = self._decode(system)
+        if not snapshots:
+            return None
+        tick, snapshot, since_keyframe = snapshots[-1]
+        self._last[system] = (tick, snapshot, since_keyframe)
+        return self._last[system]
+
+    def _decode(self, system):
+        # Replays the deltas from the first keyframe on: [(tick, snapshot, snapshots since keyframe)]
+        rows = self._conn.execute(
+            "SELECT tick, keyframe, body FROM influence_snapshots WHERE system = ? ORDER BY rowid",
+            (system,)
+        ).fetchall()
+        snapshots, state, since_keyframe = [], None, 0
+        for tick, keyframe, body in rows:
+            delta = json.loads(zlib.decompress(body))
+            if keyframe:
+                state, since_keyframe = delta, 0
+            elif state is None:
+                continue
+            else:
+                state = {name: value for name, value in state.items() if name not in delta}
+                state.update({name: value for name, value in delta.items() if value is not None})
+                since_keyframe += 1
+            snapshots.append((tick, state, since_keyframe))
+        return snapshots
+
+    def history(self, system):
+        """DataFrame with one row per tick and faction: Tick, Faction, Influence (0-1), State"""
+        with self._lock:
+            snapshots = self._decode(system)
+        rows = [
+            {"Tick": tick, "Faction": name, "Influence": value[0] / 100000, "State": value[1]}
+            for tick, snapshot, _ in snapshots
+            for name, value in snapshot.items()
+        ]
+        return pd.DataFrame(rows, columns=["Tick", "Faction", "Influence", "State"])
+
+    def stats(self):
+        with self._lock:
+            systems, snapshots, size, raw_size = self._conn.execute(
+                "SELECT COUNT(DISTINCT system), COUNT(*), COALESCE(SUM(LENGTH(body)), 0), "
+                "COALESCE(SUM(raw_size), 0) FROM influence_snapshots"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "systems": systems,
+            "snapshots": snapshots,
+            "bytes": size,
+            "raw_bytes": raw_size,
+        }
+
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_history():
+    """Return the process-wide influence history store, or None when INFLUENCE_HISTORY_DB is empty"""
+    global _history
+    if _history is None and INFLUENCE_HISTORY_DB:
+        with _history_lock:
+            if _history is None:
+                _history = InfluenceHistory(INFLUENCE_HISTORY_DB)
+    return _history
+
+
+def record_status(system_name, system_status):
+    """Record the EDSM snapshot of a systems/<name>/status payload; False if nothing was stored"""
+    history = get_history()
+    edsm_data = (system_status or {}).get("edsm_data") or {}
+    if history is None or not edsm_data.get("factions"):
+        return False
+    # EDSM updates a system once per tick, its timestamp identifies the snapshot
+    return history.record(system_name, edsm_data.get("last_updated"), edsm_data)
@@ -0,0 +1,135 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import api_client
+import api_metrics
+import grid
+import warmer
+from frames import memory_report
+
+def render():
+    st.title("🩺 API Status")
+
+    # Check if user is admin
+    user = st.session_state.get("user", {})
+    if not user.get("is_admin"):
+        st.error("⛔ Access denied. This page requires administrator privileges.")
+        return
+
+    breaker = api_client.breaker_stats()
+    cache = api_client.cache_stats()
+    st.markdown("### 🔌 API Connection")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Circuit", {"closed": "🟢 closed", "half-open": "🟡 half-open", "open": "🔴 open"}[breaker["state"]])
+    col2.metric("Times Opened", breaker["opened"])
+    col3.metric("Stale Payloads Served", cache["stale"])
+    col4.metric("Hedged GETs", cache["hedged"])
+
+    st.markdown("### 🔥 Cache Warmer")
+    state, rows = warmer.status()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Current Tick", state["tick"] or "unknown")
+    col2.metric("Warm Runs", state["runs"])
+    col3.metric("Last Run", datetime.fromtimestamp(state["last_run"]).strftime("%H:%M:%S") if state["last_run"] else "never")
+    col4.metric("Last Duration", f"{state['last_duration']:.1f} s" if state["last_duration"] is not None else "-")
+
+    if state["probe"] and state["probe"] != "ok":
+        st.caption(f"Tick probe: {state['probe']}")
+    if state["history_recorded"] is not None:
+        st.caption(f"Influence snapshots recorded in the last run: {state['history_recorded']}")
+    if not state["enabled"]:
+        st.info("The warmer is disabled (WARMER_ENABLED=0).")
+    elif state["running"]:
+        st.info("⏳ Warming in progress…")
+
+    if st.button("🔄 Warm now", disabled=not state["thread_alive"]):
+        warmer.trigger()
+        st.toast("Warming started")
+
+    df = pd.DataFrame(rows)
+    df["warmed_at"] = pd.to_datetime(df["warmed_at"], unit="s", utc=True)
+    counts = df["state"].value_counts()
+    st.caption(" · ".join(f"{name}: {counts.get(name, 0)}" for name in ["warm", "stale", "cold", "error"]))
+
+    icons = {"warm": "🟢 warm", "stale": "🟡 stale", "cold": "⚪ cold", "error": "🔴 error"}
+    df["state"] = df["state"].map(icons)
+    st.dataframe(
+        df.rename(columns={"dataset": "Dataset", "path": "Path", "state": "State",
+                           "warmed_at": "Warmed at", "error": "Error"}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.markdown("### 📡 Endpoints")
+    endpoints = api_metrics.endpoint_report()
+    if endpoints:
+        df = pd.DataFrame.from_dict(endpoints, orient="index").rename_axis("Endpoint").reset_index()
+        df = df.sort_values("p95_ms", ascending=False)
+        df["bytes"] = df["bytes"] / 2**20
+        df["avg_bytes"] = df["avg_bytes"] / 1024
+        st.dataframe(
+            df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "requests": st.column_config.NumberColumn("Requests"),
+                "errors": st.column_config.NumberColumn("Errors"),
+                "error_rate": st.column_config.NumberColumn("Error Rate", format="percent"),
+                "p50_ms": st.column_config.NumberColumn("p50 (ms)"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)"),
+                "p99_ms": st.column_config.NumberColumn("p99 (ms)"),
+                "decode_p50_ms": st.column_config.NumberColumn("JSON decode p50 (ms)"),
+                "bytes": st.column_config.NumberColumn("Total (MB)", format="%.1f"),
+                "avg_bytes": st.column_config.NumberColumn("Avg. Response (KB)", format="%.1f"),
+            }
+        )
+    else:
+        st.info("No API requests recorded yet.")
+
+    st.markdown("### ⏱️ Page Render Times")
+    pages = api_metrics.page_report()
+    if pages:
+        df = pd.DataFrame.from_dict(pages, orient="index").rename_axis("Page").reset_index()
+        st.dataframe(
+            df.sort_values("p95_ms", ascending=False),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "runs": st.column_config.NumberColumn("Runs"),
+                "p50_ms": st.column_config.NumberColumn("p50 (ms)"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)"),
+                "max_ms": st.column_config.NumberColumn("Max (ms)"),
+            }
+        )
+    else:
+        st.info("No page renders recorded yet.")
+
+    st.markdown("### 🧠 Caches & Memory")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Response cache")
+        st.json(api_client.cache_stats(), expanded=False)
+        st.caption("Request coalescing")
+        st.json(api_client.singleflight_stats(), expanded=False)
+        st.caption("Background prefetch")
+        st.json(api_client.prefetch_stats(), expanded=False)
+        store = api_client.store_stats()
+        if store:
+            st.caption("Persistent response store")
+            st.json(store, expanded=False)
+    with col2:
+        st.caption("Grid options cache")
+        st.json(grid.options_cache_stats(), expanded=False)
+        report = memory_report()
+        if report:
+            st.caption("DataFrame memory")
+            st.dataframe(
+                pd.DataFrame([
+                    {"Frame": name, "Rows": entry["rows"], "MB": round(entry["after"] / 2**20, 2),
+                     "Saved MB": round(entry["saved"] / 2**20, 2)}
+                    for name, entry in report.items()
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from api_client import get_json
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from grid import grid_options, show_grid
+from st_aggrid import GridUpdateMode
 
 def render():
     if not user_has_access(st.session_state.user, "3_Cmdrs"):
@@ -34,17 +35,19 @@ def render():
         })
 
         # Grid Options
-        gb = GridOptionsBuilder.from_dataframe(df)
-        gb.configure_default_column(filter=True, editable=False, groupable=True)
-        gb.configure_grid_options(domLayout='normal')
-        grid_options = gb.build()
+        options = grid_options(
+            df,
+            defaults=dict(filter=True, editable=False, groupable=True),
+            grid=dict(domLayout='normal')
+        )
 
         st.markdown("### 🔍 Cmdr Data Grid – Filter, Sort & Group")
 
-        AgGrid(
+        show_grid(
             df,
-            gridOptions=grid_options,
+            options,
             height=600,
+            max_height=600,
             theme="alpine",
             update_mode=GridUpdateMode.NO_UPDATE,
             enable_enterprise_modules=True
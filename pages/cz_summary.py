@@ -1,17 +1,17 @@
 import streamlit as st
 import pandas as pd
+import plotly.express as px
+import threading
 from datetime import datetime, timedelta
 from api_client import get_json
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from frames import to_frame
+from ui import lazy_tabs
+from grid import grid_options, show_grid
+from st_aggrid import GridUpdateMode
 
 def aggrid_fixed(df, height=300, key=None, col_widths=None, always_scroll=True):
-    gb = GridOptionsBuilder.from_dataframe(df)
-    gb.configure_default_column(resizable=True, sortable=True, filter=True)
     # Feste Spaltenbreiten setzen
-    if col_widths:
-        for col, width in col_widths.items():
-            gb.configure_column(col, width=width)
-    grid_options = gb.build()
+    options = grid_options(df, defaults=dict(resizable=True, sortable=True, filter=True), widths=col_widths)
     # Höhe dynamisch nach Zeilenzahl anpassen (maximal 600px)
     if df is not None and not df.empty:
         # Für Cmdr Distribution: Zeilenhöhe dynamisch, aber Grid immer scrollbar
@@ -22,17 +22,144 @@ def aggrid_fixed(df, height=300, key=None, col_widths=None, always_scroll=True):
         else:
             height = min(600, 40 + 35 * len(df))
     # Workaround: key immer eindeutig, abhängig von Tab, Periode, System und Grid-Typ
-    return AgGrid(
+    return show_grid(
         df,
-        gridOptions=grid_options,
+        options,
         update_mode=GridUpdateMode.NO_UPDATE,
         height=height,
+        max_height=600,
         allow_unsafe_jscode=True,
         enable_enterprise_modules=True,
         fit_columns_on_grid_load=False,
         key=key
     )
 
+CZ_TYPES = ["Low", "Medium", "High"]
+
+# Beschriftung und Spaltenbreiten je Tab
+CZ_KINDS = {
+    "space": {
+        "title": "Space CZ Summary",
+        "total": "Total: {} CZs",
+        "widths": {"Cmdr": 180, "Low": 80, "Medium": 80, "High": 80, "Total": 80},
+    },
+    "ground": {
+        "title": "Ground CZ Summary",
+        "total": "Total Ground CZs: {}",
+        "widths": {"Cmdr": 200, "Low": 100, "Medium": 100, "High": 100, "Total": 100},
+    },
+}
+
+# CZ-Würfel je (Tab, Periode); neu berechnet nur wenn sich der Payload ändert
+_cz_cubes = {}
+_cz_cubes_lock = threading.Lock()
+
+def get_cz_cube(kind, period, data):
+    """Return the CZ cube of a list payload, built once per fetched payload.
+
+    The response cache hands out the same object until the payload changes,
+    so switching systems or tabs reuses the cube.
+    """
+    with _cz_cubes_lock:
+        cached = _cz_cubes.get((kind, period))
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    cube = build_cz_cube(to_frame(data, name=f"CZ Summary: {kind.title()}"))
+    with _cz_cubes_lock:
+        _cz_cubes[(kind, period)] = (data, cube)
+    return cube
+
+def build_cz_cube(df):
+    """Aggregate a CZ summary payload for all systems in one pass.
+
+    The cube holds the CZ counts per starsystem, cz_type, cmdr (and
+    settlement for ground CZs). Derived from it are the per-commander
+    Low/Medium/High/Total matrix, the per-system type counts and the
+    per-settlement totals, all indexed by starsystem.
+    """
+    cz_type = df["cz_type"].str.lower().map({t.lower(): t for t in CZ_TYPES}).rename("cz_type")
+    keys = [df["starsystem"], cz_type, df["cmdr"]]
+    if "settlement" in df.columns:
+        keys.append(df["settlement"])
+    # Unknown CZ types only count towards the totals
+    cube = df["cz_count"].groupby(keys, observed=True, dropna=False).sum()
+
+    by_cmdr = cube.groupby(level=["starsystem", "cmdr", "cz_type"], observed=True, dropna=False).sum().unstack("cz_type", fill_value=0)
+    cmdrs = by_cmdr.reindex(columns=CZ_TYPES, fill_value=0)
+    cmdrs["Total"] = by_cmdr.sum(axis=1)
+    cmdrs.columns.name = None
+
+    settlements = None
+    if "settlement" in df.columns:
+        settlements = cube.groupby(level=["starsystem", "settlement"], observed=True).sum().rename("CZs")
+    return {
+        "systems": sorted(cmdrs.index.get_level_values(0).unique()),
+        "cube": cube,
+        "types": cmdrs.groupby(level=0, observed=True).sum(),
+        "cmdrs": cmdrs,
+        "settlements": settlements,
+    }
+
+def render_cz_list(summary, kind, selected_period):
+    """Render the per-system view of a CZ cube"""
+    labels = CZ_KINDS[kind]
+    systems = summary["systems"]
+    # System-Filter: key abhängig von Periode und Tab
+    system_key = f"{kind}cz_system_{selected_period}"
+    if st.session_state.get(system_key) not in systems:
+        st.session_state[system_key] = systems[0]
+    selected_system = st.selectbox(
+        "Select Starsystem:",
+        systems,
+        key=system_key
+    )
+    st.markdown(f"**{selected_system} - {labels['title']}**")
+    counts = summary["types"].loc[selected_system]
+    st.markdown(labels["total"].format(counts["Total"]))
+    cz_df = pd.DataFrame({"Type": CZ_TYPES, "Count": [counts[t] for t in CZ_TYPES]})
+    aggrid_fixed(
+        cz_df,
+        height=150,
+        key=f"{selected_system}_{selected_period}_{kind}_cz",
+        col_widths={"Type": 100, "Count": 80}
+    )
+
+    # Settlements
+    if summary["settlements"] is not None:
+        settlements = summary["settlements"].xs(selected_system, level=0).rename_axis("Settlement").reset_index()
+        st.markdown("Settlements:")
+        aggrid_fixed(
+            settlements,
+            height=min(400, 40 + 35 * len(settlements)),
+            key=f"{selected_system}_{selected_period}_{kind}_settlements",
+            col_widths={"Settlement": 320, "CZs": 100}
+        )
+
+    # Cmdr Distribution
+    dist_df = summary["cmdrs"].xs(selected_system, level=0).rename_axis("Cmdr").reset_index()
+    st.markdown("Cmdr Distribution:")
+    aggrid_fixed(
+        dist_df,
+        height=min(400, 40 + 35 * len(dist_df)),
+        key=f"{selected_system}_{selected_period}_{kind}_cmdr",
+        col_widths=labels["widths"],
+        always_scroll=True
+    )
+
+    # Vergleich aller Systeme
+    with st.expander("🗺️ All Systems"):
+        heatmap = summary["types"][CZ_TYPES]
+        fig = px.imshow(
+            heatmap,
+            text_auto=True,
+            aspect="auto",
+            color_continuous_scale="OrRd",
+            labels={"x": "CZ Type", "y": "Starsystem", "color": "CZs"},
+            title=f"{labels['title']}: CZs per System and Type"
+        )
+        fig.update_layout(height=max(300, 60 + 30 * len(heatmap)))
+        st.plotly_chart(fig, use_container_width=True, key=f"{selected_period}_{kind}_heatmap")
+
 def main():
     st.title("⚔️ CZ Summary")
 
@@ -70,12 +197,13 @@ def main():
     )
     selected_period = [k for k, v in period_labels.items() if v == selected_label][0]
 
-    tab1, tab2 = st.tabs(["🚀 Space CZ", "🔫 Ground CZ"])
+    # Nur der sichtbare Tab lädt seine Daten
+    tabs = ["🚀 Space CZ", "🔫 Ground CZ"]
+    st.session_state["active_tab"] = tabs.index(lazy_tabs(tabs, key="cz_tab"))
 
     # SPACE CZ TAB
-    with tab1:
+    if st.session_state["active_tab"] == 0:
         st.subheader("🚀 Space CZ Summary")
-        st.session_state["active_tab"] = 0
         params = {
             "period": selected_period
         }
@@ -86,53 +214,11 @@ def main():
         else:
             # Falls Liste: aggregiere wie bei Ground CZ
             if isinstance(data, list):
-                df = pd.DataFrame(data)
-                if df.empty:
+                summary = get_cz_cube("space", selected_period, data)
+                if not summary["systems"]:
                     st.info("No Space CZ data found for selected filters.")
                 else:
-                    # System-Filter Dropdown
-                    systems = sorted(df["starsystem"].unique())
-                    # System-Filter: key abhängig von Periode und Tab
-                    system_key = f"spacecz_system_{selected_period}"
-                    if st.session_state.get(system_key) not in systems:
-                        st.session_state[system_key] = systems[0]
-                    selected_system = st.selectbox(
-                        "Select Starsystem:",
-                        systems,
-                        key=system_key
-                    )
-                    filtered_df = df[df["starsystem"] == selected_system]
-                    st.markdown(f"**{selected_system} - Space CZ Summary**")
-                    cz_types = ["Low", "Medium", "High"]
-                    cz_counts = {t: filtered_df[filtered_df["cz_type"].str.lower() == t.lower()]["cz_count"].sum() for t in cz_types}
-                    total_cz = filtered_df["cz_count"].sum()
-                    st.markdown(f"Total: {total_cz} CZs")
-                    cz_df = pd.DataFrame([{"Type": t, "Count": cz_counts[t]} for t in cz_types])
-                    aggrid_fixed(
-                        cz_df,
-                        height=150,
-                        key=f"{selected_system}_{selected_period}_space_cz",
-                        col_widths={"Type": 100, "Count": 80}
-                    )
-
-                    # Cmdr Distribution
-                    cmdr_dist = []
-                    for cmdr in filtered_df["cmdr"].unique():
-                        row = {"Cmdr": cmdr}
-                        for t in cz_types:
-                            row[t] = filtered_df[(filtered_df["cmdr"] == cmdr) & (filtered_df["cz_type"].str.lower() == t.lower())]["cz_count"].sum()
-                        row["Total"] = filtered_df[filtered_df["cmdr"] == cmdr]["cz_count"].sum()
-                        cmdr_dist.append(row)
-                    dist_df = pd.DataFrame(cmdr_dist)
-                    dist_df = dist_df[["Cmdr"] + cz_types + ["Total"]]
-                    st.markdown("Cmdr Distribution:")
-                    aggrid_fixed(
-                        dist_df,
-                        height=min(400, 40 + 35 * len(dist_df)),
-                        key=f"{selected_system}_{selected_period}_space_cmdr",
-                        col_widths={"Cmdr": 180, "Low": 80, "Medium": 80, "High": 80, "Total": 80},
-                        always_scroll=True
-                    )
+                    render_cz_list(summary, "space", selected_period)
             else:
                 summary = data.get("summary", {})
                 cz_types = ["Low", "Medium", "High"]
@@ -165,9 +251,8 @@ def main():
                     st.info("No Cmdr distribution data available.")
 
     # GROUND CZ TAB
-    with tab2:
+    if st.session_state["active_tab"] == 1:
         st.subheader("🔫 Ground CZ Summary")
-        st.session_state["active_tab"] = 1
         params = {
             "period": selected_period
         }
@@ -176,63 +261,11 @@ def main():
             st.info("No Ground CZ data found for selected filters.")
         else:
             if isinstance(data, list):
-                df = pd.DataFrame(data)
-                if df.empty:
+                summary = get_cz_cube("ground", selected_period, data)
+                if not summary["systems"]:
                     st.info("No Ground CZ data found for selected filters.")
                 else:
-                    # System-Filter Dropdown
-                    systems = sorted(df["starsystem"].unique())
-                    system_key = f"groundcz_system_{selected_period}"
-                    if st.session_state.get(system_key) not in systems:
-                        st.session_state[system_key] = systems[0]
-                    selected_system = st.selectbox(
-                        "Select Starsystem:",
-                        systems,
-                        key=system_key
-                    )
-                    filtered_df = df[df["starsystem"] == selected_system]
-                    st.markdown(f"**{selected_system} - Ground CZ Summary**")
-                    cz_types = ["Low", "Medium", "High"]
-                    cz_counts = {t: filtered_df[filtered_df["cz_type"].str.lower() == t.lower()]["cz_count"].sum() for t in cz_types}
-                    total_cz = filtered_df["cz_count"].sum()
-                    st.markdown(f"Total Ground CZs: {total_cz}")
-                    cz_df = pd.DataFrame([{"Type": t, "Count": cz_counts[t]} for t in cz_types])
-                    aggrid_fixed(
-                        cz_df,
-                        height=150,
-                        key=f"{selected_system}_{selected_period}_ground_cz",
-                        col_widths={"Type": 100, "Count": 80}
-                    )
-
-                    # Settlements
-                    settlements = filtered_df.groupby("settlement")["cz_count"].sum().reset_index()
-                    settlements = settlements.rename(columns={"cz_count": "CZs", "settlement": "Settlement"})
-                    st.markdown("Settlements:")
-                    aggrid_fixed(
-                        settlements,
-                        height=min(400, 40 + 35 * len(settlements)),
-                        key=f"{selected_system}_{selected_period}_ground_settlements",
-                        col_widths={"Settlement": 320, "CZs": 100}
-                    )
-
-                    # Cmdr Distribution
-                    cmdr_dist = []
-                    for cmdr in filtered_df["cmdr"].unique():
-                        row = {"Cmdr": cmdr}
-                        for t in cz_types:
-                            row[t] = filtered_df[(filtered_df["cmdr"] == cmdr) & (filtered_df["cz_type"].str.lower() == t.lower())]["cz_count"].sum()
-                        row["Total"] = filtered_df[filtered_df["cmdr"] == cmdr]["cz_count"].sum()
-                        cmdr_dist.append(row)
-                    dist_df = pd.DataFrame(cmdr_dist)
-                    dist_df = dist_df[["Cmdr"] + cz_types + ["Total"]]
-                    st.markdown("Cmdr Distribution:")
-                    aggrid_fixed(
-                        dist_df,
-                        height=min(400, 40 + 35 * len(dist_df)),
-                        key=f"{selected_system}_{selected_period}_ground_cmdr",
-                        col_widths={"Cmdr": 200, "Low": 100, "Medium": 100, "High": 100, "Total": 100},
-                        always_scroll=True
-                    )
+                    render_cz_list(summary, "ground", selected_period)
             else:
                 summary = data.get("summary", {})
                 cz_types = ["Low", "Medium", "High"]
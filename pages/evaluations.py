@@ -2,9 +2,28 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from api_client import get_json
+from aggregation import period_summaries
+from api_client import fetch_many, get_json
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from frames import to_frame
+from grid import grid_options, show_grid
+from st_aggrid import GridUpdateMode
+
+# Section label -> summary/<name> endpoint (also warmed by warmer.py)
+ENDPOINTS = {
+    "Market Events": "market-events",
+    "Missions Completed": "missions-completed",
+    "Missions Failed": "missions-failed",
+    "Influence by Faction": "influence-by-faction",
+    "Influence EIC": "influence-eic",
+    "Bounty Vouchers": "bounty-vouchers",
+    "Combat Bonds": "combat-bonds",
+    "Exploration Sales": "exploration-sales",
+    "Bounty Fines": "bounty-fines"
+}
+
+# fetch_many key of the Cmdr table, fetched alongside the summaries
+CMDR_KEY = "__cmdr__"
 
 def render():
     if not user_has_access(st.session_state.user, '2_Evaluations'):
@@ -13,8 +32,12 @@ def render():
 
     st.title("📈 Evaluations")
 
-    mode = st.radio("Choose mode", ["Full", "Top 5"], horizontal=True)
+    col1, col2 = st.columns([3, 1])
+    mode = col1.radio("Choose mode", ["Full", "Top 5"], horizontal=True)
     key_prefix = "top5/" if mode == "Top 5" else ""
+    local = col2.toggle("Aggregate locally", key="evaluations_local",
+                        help="Compute all summaries in the dashboard from one event snapshot of the period "
+                             "instead of asking the server for each summary")
 
     # Zeitraumfilter wie im Leaderboard
     period_labels = {
@@ -31,42 +54,75 @@ def render():
     selected_label = st.selectbox("Select Period:", list(period_labels.values()))
     selected_period = [k for k, v in period_labels.items() if v == selected_label][0]
 
-    # Load Cmdr info
+    endpoints = ENDPOINTS
+
+    cmdr_notice = st.empty()
+
+    # Reserve one slot per section so the page order stays stable
+    # while results are rendered in completion order
+    sections = {label: st.container() for label in endpoints}
+
+    if local:
+        try:
+            summaries = period_summaries(selected_period, top=5 if mode == "Top 5" else None)
+        except Exception as e:
+            cmdr_notice.info(f"Local aggregation unavailable, using the server summaries ({e})")
+        else:
+            try:
+                cmdr_info = load_cmdr_info(get_json("table/cmdr"))
+            except Exception as e:
+                cmdr_info = {}
+                cmdr_notice.warning(f"⚠️ Cmdr info not loaded: {e}")
+            for label, path in endpoints.items():
+                render_section(sections[label], label, summaries.get(path), None, cmdr_info)
+            return
+
+    paths = {label: f"summary/{key_prefix}{path}?period={selected_period}" for label, path in endpoints.items()}
+    paths[CMDR_KEY] = "table/cmdr"
+
+    # Sections finishing before the Cmdr info are held back until it arrives
+    cmdr_info = None
+    pending = []
+    for label, data, error in fetch_many(paths):
+        if label == CMDR_KEY:
+            cmdr_info = {}
+            if error:
+                cmdr_notice.warning(f"⚠️ Cmdr info not loaded: {error}")
+            else:
+                cmdr_info = load_cmdr_info(data)
+            for held_label, held_data, held_error in pending:
+                render_section(sections[held_label], held_label, held_data, held_error, cmdr_info)
+            pending = []
+        elif cmdr_info is None:
+            pending.append((label, data, error))
+        else:
+            render_section(sections[label], label, data, error, cmdr_info)
+
+def load_cmdr_info(cmdrs_raw):
+    """Map Cmdr name to squadron rank and combat rank"""
     cmdr_info = {}
-    try:
-        cmdrs_raw = get_json("table/cmdr")
-        for row in cmdrs_raw:
-            name = row.get("name")
-            squadron_rank = row.get("squadron_rank", "")
-            rank = row.get("rank_combat", "")
-            if name:
-                cmdr_info[name] = {
-                    "squadron_rank": squadron_rank,
-                    "rank": rank
-                }
-    except Exception as e:
-        st.warning(f"⚠️ Cmdr info not loaded: {e}")
-
-    endpoints = {
-        "Market Events": "market-events",
-        "Missions Completed": "missions-completed",
-        "Missions Failed": "missions-failed",
-        "Influence by Faction": "influence-by-faction",
-        "Influence EIC": "influence-eic",
-        "Bounty Vouchers": "bounty-vouchers",
-        "Combat Bonds": "combat-bonds",
-        "Exploration Sales": "exploration-sales",
-        "Bounty Fines": "bounty-fines"
-    }
+    for row in cmdrs_raw or []:
+        name = row.get("name")
+        squadron_rank = row.get("squadron_rank", "")
+        rank = row.get("rank_combat", "")
+        if name:
+            cmdr_info[name] = {
+                "squadron_rank": squadron_rank,
+                "rank": rank
+            }
+    return cmdr_info
 
-    for label, path in endpoints.items():
+def render_section(container, label, data, error, cmdr_info):
+    with container:
+        if error:
+            st.error(f"Error loading {label}: {error}")
+            return
         try:
-            data = get_json(f"summary/{key_prefix}{path}?period={selected_period}")
             if not data:
-                continue
+                return
 
             st.markdown(f"### 📊 {label}")
-            df = pd.DataFrame(data)
+            df = to_frame(data, name=f"Evaluations: {label}")
 
             # Rename columns
             rename_map = {
@@ -104,48 +160,29 @@ def render():
                 if col in df.columns:
                     df[col] = pd.to_numeric(df[col], errors="coerce")
 
-            # Grid configuration
-            gb = GridOptionsBuilder.from_dataframe(df)
-            gb.configure_side_bar()
-            gb.configure_selection("single")
-            gb.configure_grid_options(
-                suppressAutoSize=True,
-                suppressColumnVirtualisation=True,
-                suppressSizeToFit=True
+            # Grid configuration: first three columns pinned with fixed widths,
+            # currency columns formatted with toLocaleString
+            options = grid_options(
+                df,
+                side_bar=True,
+                selection="single",
+                grid=dict(
+                    suppressAutoSize=True,
+                    suppressColumnVirtualisation=True,
+                    suppressSizeToFit=True
+                ),
+                pinned={"No.": 70, "Cmdr.": 150, "Sq.-Rank": 140},
+                numeric=numeric_cols
             )
 
-            # Fix column widths and pinning for first three columns
-            for colname, width in [("No.", 70), ("Cmdr.", 150), ("Sq.-Rank", 140)]:
-                if colname in df.columns:
-                    gb.configure_column(
-                        colname,
-                        pinned="left",
-                        resizable=False,
-                        width=width,
-                        minWidth=width,
-                        maxWidth=width
-                    )
-
-            # Format all currency columns as Euro using Intl.NumberFormat
-            for col in ["Buy (Cr.)", "Sell (Cr.)", "Bounty Vouchers (Cr.)", "Combat Bonds (Cr.)",
-                        "Exploration Sales (Cr.)", "Bounty Fines (Cr.)"]:
-                if col in df.columns:
-                    gb.configure_column(
-                        col,
-                        type=["numericColumn", "rightAligned"],
-                        valueFormatter="(value != null) ? value.toLocaleString('en-US') : ''"
-                    )
-
-            grid_options = gb.build()
-
-            AgGrid(
+            show_grid(
                 df,
-                gridOptions=grid_options,
+                options,
                 update_mode=GridUpdateMode.NO_UPDATE,
                 enable_enterprise_modules=True,
                 allow_unsafe_jscode=True,
                 domLayout="normal",
-                height=min(500, 70 + 35 * len(df))
+                key=f"evaluations_{label}"
             )
 
         except Exception as e:
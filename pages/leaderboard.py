@@ -3,7 +3,8 @@ import pandas as pd
 import plotly.express as px
 from api_client import get_json
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from grid import ANALYSIS_COLUMNS, ANALYSIS_GRID, FILTER_MODEL_RETURN, apply_filter_model, grid_options, show_grid
+from st_aggrid import GridUpdateMode, DataReturnMode
 
 def render():
     if not user_has_access(st.session_state.user, '4_Leadership'):
@@ -70,92 +71,35 @@ def render():
 
         numeric_cols = [col for col in df.columns if col not in ["No.", "Cmdr.", "Sq.-Rank"]]
 
-        gb = GridOptionsBuilder.from_dataframe(df)
-        gb.configure_default_column(
-            enableRowGroup=True,
-            enablePivot=True,
-            enableValue=True,
-            filter=True,
-            sortable=True,
-            resizable=True
+        options = grid_options(
+            df,
+            defaults=ANALYSIS_COLUMNS,
+            side_bar=True,
+            selection="single",
+            grid=ANALYSIS_GRID,
+            pinned={"No.": 70, "Cmdr.": 150, "Sq.-Rank": 140},
+            numeric=numeric_cols,
+            numeric_width=120
         )
-        gb.configure_side_bar()
-        gb.configure_selection("single")
-        gb.configure_grid_options(groupDisplayType="multipleColumns", rowGroupPanelShow="always", sideBar=True)
-
-        for colname, width in [("No.", 70), ("Cmdr.", 150), ("Sq.-Rank", 140)]:
-            if colname in df.columns:
-                gb.configure_column(colname, width=width, pinned="left", resizable=False, minWidth=width, maxWidth=width)
-
-        for col in numeric_cols:
-            if col in df.columns:
-                gb.configure_column(
-                    col,
-                    type=["numericColumn", "rightAligned"],
-                    valueFormatter="(value != null) ? value.toLocaleString('en-US') : ''",
-                    width=120,
-                    minWidth=120
-                )
 
-        grid_options = gb.build()
-
-        grid_response = AgGrid(
+        grid_response = show_grid(
             df,
-            gridOptions=grid_options,
+            options,
             update_mode=GridUpdateMode.NO_UPDATE,
             enable_enterprise_modules=True,
             allow_unsafe_jscode=True,
             domLayout="normal",
-            height=min(500, 70 + 35 * len(df))
+            data_return_mode=DataReturnMode.CUSTOM,
+            custom_jscode_for_grid_return=FILTER_MODEL_RETURN,
+            update_on=["filterChanged"]
         )
 
-        # Extract only currently visible rows from grid
-        visible_df = pd.DataFrame(grid_response["data"])
-
-        st.subheader("📊 Distribution by Cmdr (Pie Chart)")
-
-        # Available metrics for charting
-        plotly_options = {
-            "M.compl.": "Missions Completed",
-            "M.failed": "Missions Failed",
-            "Inf.-EIC": "Influence (Communism Interstellar)",
-            "Buy (Cr.)": "Total Buy",
-            "Sell (Cr.)": "Total Sell",
-            "Profit (Cr.)": "Profit",
-            "Vol. (Cr.)": "Market Volume",
-            "Q. (t)": "Market Quantity",
-            "BVs (Cr.)": "Bounty Vouchers",
-            "CBs (Cr.)": "Combat Bonds",
-            "Expo. (Cr.)": "Exploration Sales",
-            "Fines (Cr.)": "Bounty Fines"
-        }
+        # Charts use the server-side DataFrame; the grid only sends back its
+        # filter model, and only when the user filters
+        visible_df = apply_filter_model(df, grid_response.get("filterModel"))
 
-        selected_metric = st.selectbox(
-            "Select metric to visualize:",
-            options=list(plotly_options.keys()),
-            format_func=lambda k: plotly_options[k]
-        )
-
-        # Check if selected metric is in dataframe
-        if selected_metric in visible_df.columns:
-            pie_df = visible_df[["Cmdr.", selected_metric]].copy()
-            pie_df = pie_df[pie_df[selected_metric] > 0]
-            pie_df = pie_df[pie_df["Cmdr."].notnull() & (pie_df["Cmdr."].str.strip() != "")]
-
-            if not pie_df.empty:
-                fig = px.pie(
-                    pie_df,
-                    names="Cmdr.",
-                    values=selected_metric,
-                    title=f"{plotly_options[selected_metric]} by Cmdr",
-                    hole=0.4
-                )
-                fig.update_traces(textinfo="percent+label")
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No data available for the selected metric.")
-        else:
-            st.warning(f"Column '{selected_metric}' not found in the dataset.")
+        # Metrikwechsel läuft nur im Fragment, ohne neuen Request und ohne Grid
+        render_metric_pie(visible_df)
 
         st.subheader("📊 Buy / Sell / Profit per Cmdr (Bar Chart)")
 
@@ -190,4 +134,52 @@ def render():
             st.warning("Required columns ('Buy (Cr.)', 'Sell (Cr.)', 'Profit (Cr.)') are missing.")
 
     except Exception as e:
-        st.error(f"Error loading Leaderboard: {e}")
\ No newline at end of file
+        st.error(f"Error loading Leaderboard: {e}")
+
+@st.fragment
+def render_metric_pie(visible_df):
+    """Pie chart of one metric per Cmdr; the metric box reruns only this fragment"""
+    st.subheader("📊 Distribution by Cmdr (Pie Chart)")
+
+    # Available metrics for charting
+    plotly_options = {
+        "M.compl.": "Missions Completed",
+        "M.failed": "Missions Failed",
+        "Inf.-EIC": "Influence (Communism Interstellar)",
+        "Buy (Cr.)": "Total Buy",
+        "Sell (Cr.)": "Total Sell",
+        "Profit (Cr.)": "Profit",
+        "Vol. (Cr.)": "Market Volume",
+        "Q. (t)": "Market Quantity",
+        "BVs (Cr.)": "Bounty Vouchers",
+        "CBs (Cr.)": "Combat Bonds",
+        "Expo. (Cr.)": "Exploration Sales",
+        "Fines (Cr.)": "Bounty Fines"
+    }
+
+    selected_metric = st.selectbox(
+        "Select metric to visualize:",
+        options=list(plotly_options.keys()),
+        format_func=lambda k: plotly_options[k]
+    )
+
+    # Check if selected metric is in dataframe
+    if selected_metric in visible_df.columns:
+        pie_df = visible_df[["Cmdr.", selected_metric]].copy()
+        pie_df = pie_df[pie_df[selected_metric] > 0]
+        pie_df = pie_df[pie_df["Cmdr."].notnull() & (pie_df["Cmdr."].str.strip() != "")]
+
+        if not pie_df.empty:
+            fig = px.pie(
+                pie_df,
+                names="Cmdr.",
+                values=selected_metric,
+                title=f"{plotly_options[selected_metric]} by Cmdr",
+                hole=0.4
+            )
+            fig.update_traces(textinfo="percent+label")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No data available for the selected metric.")
+    else:
+        st.warning(f"Column '{selected_metric}' not found in the dataset.")
@@ -1,8 +1,7 @@
 import streamlit as st
 from datetime import datetime
 import json
-import requests
-from api_client import get_json, API_BASE, API_KEY, API_VERSION
+from api_client import get_json, request
 from auth import user_has_access
 
 def render():
@@ -148,14 +147,11 @@ def render():
 
         if st.button("🚀 Create Objective", type="primary"):
             try:
-                response = requests.post(
-                    f"{API_BASE}/objectives",
+                response = request(
+                    "POST",
+                    "objectives",
                     json=objective,
-                    headers={
-                        'apikey': API_KEY,
-                        'apiversion': API_VERSION,
-                        'Content-Type': 'application/json'
-                    }
+                    headers={'Content-Type': 'application/json'}
                 )
                 if response.status_code == 201:
                     st.success("✅ Objective created successfully!")
@@ -199,13 +195,7 @@ def render():
                 with col2:
                     if st.button("🗑️ Delete Objective", type="secondary", disabled=not confirm_delete):
                         try:
-                            response = requests.delete(
-                                f"{API_BASE}/objectives/{objective_id}",
-                                headers={
-                                    'apikey': API_KEY,
-                                    'apiversion': API_VERSION
-                                }
-                            )
+                            response = request("DELETE", f"objectives/{objective_id}")
                             if response.status_code == 200:
                                 st.success("✅ Objective deleted successfully!")
                                 st.rerun()
@@ -3,7 +3,8 @@ import pandas as pd
 import plotly.express as px
 from api_client import get_json
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from grid import ANALYSIS_COLUMNS, ANALYSIS_GRID, grid_options, show_grid
+from st_aggrid import GridUpdateMode
 
 def render():
     if not user_has_access(st.session_state.user, '5_Recruits'):
@@ -46,43 +47,24 @@ def render():
 
         numeric_cols = [col for col in df.columns if col not in ["No.", "Cmdr.", "Has Data", "Last Active"]]
 
-        gb = GridOptionsBuilder.from_dataframe(df)
-        gb.configure_default_column(
-            enableRowGroup=True,
-            enablePivot=True,
-            enableValue=True,
-            filter=True,
-            sortable=True,
-            resizable=True
+        options = grid_options(
+            df,
+            defaults=ANALYSIS_COLUMNS,
+            side_bar=True,
+            selection="single",
+            grid=ANALYSIS_GRID,
+            pinned={"No.": 70, "Cmdr.": 150},
+            numeric=numeric_cols,
+            numeric_width=120
         )
-        gb.configure_side_bar()
-        gb.configure_selection("single")
-        gb.configure_grid_options(groupDisplayType="multipleColumns", rowGroupPanelShow="always", sideBar=True)
-
-        for colname, width in [("No.", 70), ("Cmdr.", 150)]:
-            if colname in df.columns:
-                gb.configure_column(colname, width=width, pinned="left", resizable=False, minWidth=width, maxWidth=width)
-
-        for col in numeric_cols:
-            if col in df.columns:
-                gb.configure_column(
-                    col,
-                    type=["numericColumn", "rightAligned"],
-                    valueFormatter="(value != null) ? value.toLocaleString('en-US') : ''",
-                    width=120,
-                    minWidth=120
-                )
-
-        grid_options = gb.build()
 
-        grid_response = AgGrid(
+        grid_response = show_grid(
             df,
-            gridOptions=grid_options,
+            options,
             update_mode=GridUpdateMode.NO_UPDATE,
             enable_enterprise_modules=True,
             allow_unsafe_jscode=True,
-            domLayout="normal",
-            height=min(500, 70 + 35 * len(df))
+            domLayout="normal"
         )
 
     except Exception as e:
@@ -1,9 +1,12 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from api_client import get_json
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
+from frames import to_frame
+from periods import SLICE_WINDOW, in_window, slice_period, time_window
+from grid import (ANALYSIS_COLUMNS, ANALYSIS_GRID, FILTER_MODEL_RETURN, apply_filter_model, grid_options,
+                  server_side_state, show_grid, show_server_side_grid)
+from st_aggrid import GridUpdateMode, DataReturnMode, JsCode
 
 def render():
     if not user_has_access(st.session_state.user, '6_RedeemVouchers'):
@@ -28,12 +31,18 @@ def render():
     selected_period = [k for k, v in period_labels.items() if v == selected_label][0]
 
     try:
-        data = get_json(f"bounty-vouchers?period={selected_period}")
-        if not data:
-            st.warning("No voucher data found.")
-            return
-
-        df = pd.DataFrame(data)
+        if st.session_state.get("slice_periods") and in_window(selected_period):
+            # One request for the widest window, every period is cut out locally
+            data = get_json(f"bounty-vouchers?period={SLICE_WINDOW}")
+            window = time_window("bounty-vouchers", data, "timestamp",
+                                 lambda rows: to_frame(rows, name="Redeem Vouchers"))
+            df = slice_period(window, selected_period).reset_index(drop=True)
+        else:
+            data = get_json(f"bounty-vouchers?period={selected_period}")
+            if not data:
+                st.warning("No voucher data found.")
+                return
+            df = to_frame(data, name="Redeem Vouchers")
         if df.empty:
             st.warning("No voucher data found.")
             return
@@ -51,6 +60,16 @@ def render():
         }
         df.rename(columns=rename_map, inplace=True)
 
+        # Filter und Chart laufen als Fragment auf dem bereits geladenen DataFrame
+        render_vouchers(df)
+
+    except Exception as e:
+        st.error(f"Error loading voucher data: {e}")
+
+@st.fragment
+def render_vouchers(df):
+    """Filters, table and chart; changing a filter reruns only this fragment"""
+    try:
         # Filter selection boxes
         cmdr_list = sorted(df["Cmdr"].dropna().unique())
         starsystem_list = sorted(df["Star System"].dropna().unique())
@@ -80,46 +99,61 @@ def render():
                 return f"{params['values'].sum():,.0f}"
             return ""
 
-        gb = GridOptionsBuilder.from_dataframe(filtered_df)
-        gb.configure_default_column(
-            enableRowGroup=True,
-            enablePivot=True,
-            enableValue=True,
-            filter=True,
-            sortable=True,
-            resizable=True
-        )
-        gb.configure_side_bar()
-        gb.configure_selection("single")
-        gb.configure_grid_options(groupDisplayType="multipleColumns", rowGroupPanelShow="always", sideBar=True)
-        gb.configure_column("Voucher Amount", type=["numericColumn", "rightAligned"],
-                            valueFormatter="(value != null) ? value.toLocaleString('en-US') : ''",
-                            aggFunc="sum", footerValueGetter="sum")
-        gb.configure_column("Cmdr", width=150, pinned="left")
-        gb.configure_column("Star System", width=150)
-        gb.configure_column("Faction", width=150)
-        gb.configure_column("Redemption Time", width=180)
-        gb.configure_grid_options(
-            groupIncludeFooter=True,
-            groupIncludeTotalFooter=True
-        )
-        grid_options = gb.build()
-
         st.subheader("Voucher Redemptions (Table)")
-        grid_response = AgGrid(
-            filtered_df,
-            gridOptions=grid_options,
-            update_mode=GridUpdateMode.NO_UPDATE,
-            enable_enterprise_modules=True,
-            allow_unsafe_jscode=True,
-            domLayout="normal",
-            height=min(500, 70 + 35 * len(filtered_df))
-        )
-
-        visible_df = pd.DataFrame(grid_response["data"])
+        server_side = st.toggle("Server-side grid", key="vouchers_server_side",
+                                help="Sort, filter and group all redemptions here; "
+                                     "only the current block is sent to the browser")
+        if server_side:
+            _, result = show_server_side_grid(
+                filtered_df,
+                key="vouchers_grid",
+                group_by_options=["Cmdr", "Star System", "Faction", "Tick ID"],
+                sum_columns=["Voucher Amount"],
+                grid_config=dict(
+                    numeric=["Voucher Amount"],
+                    columns={"Cmdr": dict(width=150, pinned="left")},
+                    widths={"Star System": 150, "Faction": 150, "Redemption Time": 180}
+                ),
+                allow_unsafe_jscode=True,
+                domLayout="normal"
+            )
+            if st.session_state.get("vouchers_grid_group_by"):
+                # Grouped rows only carry the sums, the chart needs the redemptions
+                visible_df = apply_filter_model(filtered_df, server_side_state("vouchers_grid").get("filterModel"))
+            else:
+                visible_df = result
+        else:
+            options = grid_options(
+                filtered_df,
+                defaults=ANALYSIS_COLUMNS,
+                side_bar=True,
+                selection="single",
+                grid=dict(ANALYSIS_GRID, groupIncludeFooter=True, groupIncludeTotalFooter=True),
+                numeric=["Voucher Amount"],
+                columns={
+                    "Voucher Amount": dict(aggFunc="sum", footerValueGetter="sum"),
+                    "Cmdr": dict(width=150, pinned="left"),
+                },
+                widths={"Star System": 150, "Faction": 150, "Redemption Time": 180}
+            )
+
+            grid_response = show_grid(
+                filtered_df,
+                options,
+                update_mode=GridUpdateMode.NO_UPDATE,
+                enable_enterprise_modules=True,
+                allow_unsafe_jscode=True,
+                domLayout="normal",
+                data_return_mode=DataReturnMode.CUSTOM,
+                custom_jscode_for_grid_return=FILTER_MODEL_RETURN,
+                update_on=["filterChanged"]
+            )
+
+            # Chart from the server-side DataFrame, narrowed by the grid filter
+            visible_df = apply_filter_model(filtered_df, grid_response.get("filterModel"))
 
         st.subheader("📊 Voucher Amount by Cmdr (Pie Chart)")
-        pie_df = visible_df.groupby("Cmdr", as_index=False)["Voucher Amount"].sum()
+        pie_df = visible_df.groupby("Cmdr", as_index=False, observed=True)["Voucher Amount"].sum()
         pie_df = pie_df[pie_df["Voucher Amount"] > 0]
         pie_df = pie_df[pie_df["Cmdr"].notnull() & (pie_df["Cmdr"].str.strip() != "")]
         if not pie_df.empty:
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from datetime import datetime, timedelta
-from api_client import get_json
+from api_client import cache_state, get_json, prefetch
 from auth import user_has_access
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from ui import lazy_tabs, cached_section
+from grid import CREDITS_FORMATTER, grid_options, show_grid
+from influence_history import get_history
+from st_aggrid import GridUpdateMode
 import json
 
 def format_conflict_status(conflict_status, conflict_details):
@@ -37,6 +41,12 @@ def render():
             st.warning("No systems found with recent activity or EDSM data")
             return
             
+        # Status details in the background, so clicking a system is served from the cache;
+        # once per systems/list payload, not on every rerun
+        if st.session_state.get("systems_prefetched") is not systems_data:
+            st.session_state["systems_prefetched"] = systems_data
+            prefetch_system_status(systems_list)
+        
         # Create overview table
         st.subheader("📊 Systems Overview")
         
@@ -57,23 +67,21 @@ def render():
         display_df.insert(0, "No.", range(1, len(display_df) + 1))
         
         # Configure grid for system selection
-        gb = GridOptionsBuilder.from_dataframe(display_df)
-        gb.configure_selection("single", use_checkbox=True)
-        gb.configure_grid_options(suppressAutoSize=True)
-        
-        # Configure columns
-        gb.configure_column("No.", width=60, pinned="left")
-        gb.configure_column("System", width=150, pinned="left")
-        gb.configure_column("Controlling Faction", width=200)
-        gb.configure_column("Active CMDRs", width=120, type=["numericColumn"])
-        gb.configure_column("Has EDSM Data", width=120)
-        gb.configure_column("Conflict Status", width=150)
-        
-        grid_options = gb.build()
+        options = grid_options(
+            display_df,
+            selection=dict(selection_mode="single", use_checkbox=True),
+            grid=dict(suppressAutoSize=True),
+            widths={"Controlling Faction": 200, "Has EDSM Data": 120, "Conflict Status": 150},
+            columns={
+                "No.": dict(width=60, pinned="left"),
+                "System": dict(width=150, pinned="left"),
+                "Active CMDRs": dict(width=120, type=["numericColumn"]),
+            }
+        )
         
-        systems_grid = AgGrid(
+        systems_grid = show_grid(
             display_df,
-            gridOptions=grid_options,
+            options,
             update_mode=GridUpdateMode.SELECTION_CHANGED,
             height=300,
             allow_unsafe_jscode=True
@@ -115,6 +123,23 @@ def render():
     except Exception as e:
         st.error(f"Error loading systems: {e}")
 
+def prefetch_system_status(systems_list):
+    """Queue the status of every system for both periods.
+
+    Systems with active CMDRs and conflicts come first, quiet systems last;
+    the current day before yesterday. Statuses fresh in the cache are skipped.
+    """
+    for system in systems_list:
+        name = system.get("system_name")
+        if not name:
+            continue
+        in_conflict = system.get("conflict_status") in ["war", "civil_war", "election", "multiple"]
+        rank = 2 - bool(system.get("active_cmdrs")) - in_conflict
+        for offset, period in enumerate(period_labels):
+            path = f"systems/{name}/status?period={period}"
+            if cache_state(path) != "fresh":
+                prefetch([path], priority=2 * rank + offset)
+
 def render_system_details(system_status, period):
     """Render detailed system information"""
     
@@ -234,51 +259,41 @@ def render_system_details(system_status, period):
         else:
             st.info("ℹ️ No recent activity detected in this system")
     
+    render_influence_history(system_name, edsm_data)
+    
     # Commander Activity Details
     if cmdr_summary:
         st.markdown("---")
         st.markdown("### 👥 Commander Activity Details")
         
-        # Create commander activity dataframe
-        cmdr_rows = []
-        for cmdr, data in cmdr_summary.items():
-            cmdr_rows.append({
-                "Commander": cmdr,
-                "Missions": data.get("missions_completed", 0),
-                "Combat Bonds": f"{data.get('combat_bonds', 0):,} Cr",
-                "Bounty Vouchers": f"{data.get('bounty_vouchers', 0):,} Cr", 
-                "Exploration": f"{data.get('exploration_earnings', 0):,} Cr",
-                "Market Trans.": data.get("market_transactions", 0),
-                "Total Credits": f"{data.get('total_credits', 0):,} Cr"
-            })
+        # Create commander activity dataframe (numeric, formatted by the grid)
+        cmdr_df = pd.DataFrame.from_dict(cmdr_summary, orient="index")
+        cmdr_df = cmdr_df.reindex(columns=list(CMDR_COLUMNS)).rename(columns=CMDR_COLUMNS)
+        cmdr_df = cmdr_df.fillna(0).astype("int64")
+        cmdr_df.insert(0, "Commander", cmdr_df.index)
         
-        if cmdr_rows:
-            cmdr_df = pd.DataFrame(cmdr_rows)
-            cmdr_df.insert(0, "No.", range(1, len(cmdr_df) + 1))
-            
+        if not cmdr_df.empty:
             # Sort by total credits
-            cmdr_df["Credits_Numeric"] = [int(row["Total Credits"].replace(" Cr", "").replace(",", "")) for _, row in cmdr_df.iterrows()]
-            cmdr_df = cmdr_df.sort_values("Credits_Numeric", ascending=False).drop("Credits_Numeric", axis=1).reset_index(drop=True)
-            cmdr_df["No."] = range(1, len(cmdr_df) + 1)
+            cmdr_df = cmdr_df.sort_values("Total Credits", ascending=False, kind="stable").reset_index(drop=True)
+            cmdr_df.insert(0, "No.", range(1, len(cmdr_df) + 1))
             
             # Configure grid
-            gb = GridOptionsBuilder.from_dataframe(cmdr_df)
-            gb.configure_grid_options(suppressAutoSize=True)
-            
-            # Configure columns
-            gb.configure_column("No.", width=60, pinned="left")
-            gb.configure_column("Commander", width=150, pinned="left")
-            gb.configure_column("Missions", width=80, type=["numericColumn"])
-            gb.configure_column("Market Trans.", width=100, type=["numericColumn"])
-            
-            for col in ["Combat Bonds", "Bounty Vouchers", "Exploration", "Total Credits"]:
-                gb.configure_column(col, width=120, type=["rightAligned"])
-            
-            grid_options = gb.build()
+            options = grid_options(
+                cmdr_df,
+                grid=dict(suppressAutoSize=True),
+                columns={
+                    "No.": dict(width=60, pinned="left"),
+                    "Commander": dict(width=150, pinned="left"),
+                    "Missions": dict(width=80, type=["numericColumn"]),
+                    "Market Trans.": dict(width=100, type=["numericColumn"]),
+                    **{col: dict(width=120, type=["numericColumn", "rightAligned"], valueFormatter=CREDITS_FORMATTER)
+                       for col in ["Combat Bonds", "Bounty Vouchers", "Exploration", "Total Credits"]},
+                }
+            )
             
-            AgGrid(
+            show_grid(
                 cmdr_df,
-                gridOptions=grid_options,
+                options,
                 update_mode=GridUpdateMode.NO_UPDATE,
                 height=min(400, 70 + 35 * len(cmdr_df)),
                 allow_unsafe_jscode=True
@@ -289,68 +304,86 @@ def render_system_details(system_status, period):
         st.markdown("---")
         st.markdown("### 📝 Detailed Activity Logs")
         
-        tab1, tab2, tab3, tab4 = st.tabs(["🎯 Missions", "⚔️ Combat", "💰 Bounties", "🔍 Exploration"])
-        
-        with tab1:
-            missions = activity_data.get("missions_completed", [])
-            if missions:
-                missions_df = pd.DataFrame(missions)
-                missions_df = missions_df.rename(columns={
-                    "cmdr": "Commander",
-                    "awarding_faction": "Faction", 
-                    "mission_name": "Mission",
-                    "reward": "Reward",
-                    "timestamp": "Time"
-                })
-                missions_df["Reward"] = missions_df["Reward"].apply(lambda x: f"{x:,} Cr" if pd.notnull(x) else "0 Cr")
-                st.dataframe(missions_df, use_container_width=True)
-            else:
-                st.info("No missions completed in this period")
-        
-        with tab2:
-            bonds = activity_data.get("combat_bonds", [])
-            if bonds:
-                bonds_df = pd.DataFrame(bonds)
-                bonds_df = bonds_df.rename(columns={
-                    "cmdr": "Commander",
-                    "awarding_faction": "For Faction",
-                    "victim_faction": "Against Faction", 
-                    "reward": "Bond Value",
-                    "timestamp": "Time"
-                })
-                bonds_df["Bond Value"] = bonds_df["Bond Value"].apply(lambda x: f"{x:,} Cr" if pd.notnull(x) else "0 Cr")
-                st.dataframe(bonds_df, use_container_width=True)
-            else:
-                st.info("No combat bonds redeemed in this period")
-        
-        with tab3:
-            vouchers = activity_data.get("bounty_vouchers", [])
-            if vouchers:
-                vouchers_df = pd.DataFrame(vouchers)
-                vouchers_df = vouchers_df.rename(columns={
-                    "cmdr": "Commander",
-                    "faction": "Faction",
-                    "amount": "Amount",
-                    "timestamp": "Time"
-                })
-                vouchers_df["Amount"] = vouchers_df["Amount"].apply(lambda x: f"{x:,} Cr" if pd.notnull(x) else "0 Cr")
-                st.dataframe(vouchers_df, use_container_width=True)
-            else:
-                st.info("No bounty vouchers redeemed in this period")
-        
-        with tab4:
-            exploration = activity_data.get("exploration_sales", [])
-            if exploration:
-                exploration_df = pd.DataFrame(exploration)
-                exploration_df = exploration_df.rename(columns={
-                    "cmdr": "Commander",
-                    "earnings": "Earnings",
-                    "timestamp": "Time"
-                })
-                exploration_df["Earnings"] = exploration_df["Earnings"].apply(lambda x: f"{x:,} Cr" if pd.notnull(x) else "0 Cr")
-                st.dataframe(exploration_df, use_container_width=True)
-            else:
-                st.info("No exploration data sold in this period")
+        # Nur der gewählte Tab baut seine Tabelle, einmal pro System und Periode
+        selected_tab = lazy_tabs(list(ACTIVITY_TABS), key="systems_activity_tab")
+        source, columns, amount_col, empty_msg = ACTIVITY_TABS[selected_tab]
+        rows = activity_data.get(source, [])
+        if rows:
+            activity_df = cached_section(
+                f"systems_activity_{source}",
+                lambda: build_activity_df(rows, columns, amount_col),
+                rows
+            )
+            st.dataframe(
+                activity_df,
+                use_container_width=True,
+                column_config={amount_col: st.column_config.NumberColumn(f"{amount_col} (Cr)", format="localized")}
+            )
+        else:
+            st.info(empty_msg)
+
+def render_influence_history(system_name, edsm_data):
+    """Chart the influence history the cache warmer records every tick"""
+    history = get_history()
+    if history is None or not edsm_data or not edsm_data.get("factions"):
+        return
+    try:
+        df = history.history(system_name)
+    except Exception as e:
+        st.warning(f"Influence history unavailable: {e}")
+        return
+    
+    with st.expander("📈 Influence History", expanded=False):
+        if df["Tick"].nunique() < 2:
+            st.info("The chart appears once the influence of two ticks has been recorded")
+            return
+        fig = px.line(df, x="Tick", y="Influence", color="Faction", markers=True, hover_data=["State"])
+        fig.update_layout(yaxis_tickformat=".0%")
+        st.plotly_chart(fig, use_container_width=True)
+
+def build_activity_df(rows, columns, amount_col):
+    """DataFrame of one activity log with readable columns and numeric credits"""
+    df = pd.DataFrame(rows).rename(columns=columns)
+    df[amount_col] = pd.to_numeric(df[amount_col], errors="coerce").fillna(0).astype("int64")
+    return df
+
+# Commander activity: cmdr_summary field -> column name
+CMDR_COLUMNS = {
+    "missions_completed": "Missions",
+    "combat_bonds": "Combat Bonds",
+    "bounty_vouchers": "Bounty Vouchers",
+    "exploration_earnings": "Exploration",
+    "market_transactions": "Market Trans.",
+    "total_credits": "Total Credits",
+}
+
+# Activity log tabs: activity_data key, column names, credit column, empty message
+ACTIVITY_TABS = {
+    "🎯 Missions": (
+        "missions_completed",
+        {"cmdr": "Commander", "awarding_faction": "Faction", "mission_name": "Mission", "reward": "Reward", "timestamp": "Time"},
+        "Reward",
+        "No missions completed in this period",
+    ),
+    "⚔️ Combat": (
+        "combat_bonds",
+        {"cmdr": "Commander", "awarding_faction": "For Faction", "victim_faction": "Against Faction", "reward": "Bond Value", "timestamp": "Time"},
+        "Bond Value",
+        "No combat bonds redeemed in this period",
+    ),
+    "💰 Bounties": (
+        "bounty_vouchers",
+        {"cmdr": "Commander", "faction": "Faction", "amount": "Amount", "timestamp": "Time"},
+        "Amount",
+        "No bounty vouchers redeemed in this period",
+    ),
+    "🔍 Exploration": (
+        "exploration_sales",
+        {"cmdr": "Commander", "earnings": "Earnings", "timestamp": "Time"},
+        "Earnings",
+        "No exploration data sold in this period",
+    ),
+}
 
 # Helper for period labels
 period_labels = {
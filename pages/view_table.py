@@ -2,12 +2,76 @@ import streamlit as st
 import pandas as pd
 import json
 import ast
+import os
 from datetime import datetime, timedelta
-from api_client import get_json
+from functools import lru_cache
+from api_client import query_table
 from auth import user_has_access
+from frames import to_frame
+from grid import show_server_side_grid
+from table_replica import get_replica
 
 st.set_page_config(layout="wide")
 
+# Tables served from a local incremental replica; all others are queried
+# page by page with the filters pushed down to the API
+REPLICATED_TABLES = [t.strip() for t in os.getenv("REPLICA_TABLES", "event").split(",") if t.strip()]
+
+PAGE_SIZES = [100, 500, 1000, 5000]
+
+# Columns requested for the grid; large columns are only loaded on demand
+# for the selected row
+GRID_COLUMNS = {
+    "event": ["id", "event", "timestamp", "tickid", "ticktime", "cmdr", "starsystem", "systemaddress"],
+}
+LAZY_COLUMNS = {
+    "event": "raw_json",
+}
+# Replicas of these tables keep a sorted UTC index on the given column
+TIME_COLUMNS = {
+    "event": "timestamp",
+}
+# Group-by choices of the server-side grid
+GROUP_COLUMNS = {
+    "event": ["cmdr", "event", "tickid", "starsystem"],
+}
+
+@lru_cache(maxsize=64)
+def fetch_lazy_value(table, column, row_id):
+    """Load one large column value of a single row (recently viewed rows are cached).
+
+    Raises KeyError if the API has no row with that id.
+    """
+    rows, _ = query_table(table, {"id": row_id}, limit=1, columns=["id", column])
+    # APIs ignoring the id filter return the first page of the table instead
+    row = next((r for r in rows if r.get("id") == row_id), None)
+    if row is None:
+        raise KeyError(row_id)
+    return row.get(column)
+
+def filter_events(df, filters):
+    """Apply the Table Viewer filters locally (replica or APIs without filter support)"""
+    if filters.get('cmdr'):
+        df = df[df['cmdr'] == filters['cmdr']]
+    if filters.get('event'):
+        df = df[df['event'] == filters['event']]
+    if filters.get('tickid'):
+        df = df[df['tickid'] == filters['tickid']]
+    if (filters.get('from') or filters.get('to')) and 'timestamp' in df.columns:
+        ts = pd.to_datetime(df['timestamp'], errors='coerce')
+        # Zeitzone angleichen: falls keine vorhanden, auf UTC setzen
+        if ts.dt.tz is None:
+            ts = ts.dt.tz_localize('UTC')
+        else:
+            ts = ts.dt.tz_convert('UTC')
+        mask = pd.Series(True, index=df.index)
+        if filters.get('from'):
+            mask &= ts >= pd.to_datetime(filters['from']).tz_localize('UTC')
+        if filters.get('to'):
+            mask &= ts <= pd.to_datetime(filters['to']).tz_localize('UTC')
+        df = df.loc[mask]
+    return df
+
 def render():
     if not user_has_access(st.session_state.user, '1_TableView'):
         st.error('Unauthorized')
@@ -36,65 +100,116 @@ def render():
     if not selected_table:
         st.stop()
 
-    # Daten laden
-    data = get_json(f'table/{selected_table}')
-    if not data:
-        st.warning("No data returned.")
-        st.stop()
+    replicated = selected_table in REPLICATED_TABLES
 
-    df = pd.DataFrame(data)
+    # Daten laden
+    df = None
+    if replicated:
+        # Served from a local, incrementally synced replica
+        replica = get_replica(selected_table, columns=GRID_COLUMNS.get(selected_table),
+                              time_column=TIME_COLUMNS.get(selected_table))
+        if st.button("🔄 Full resync", help=f"Re-download the complete {selected_table} table"):
+            replica.sync(force_full=True)
+        df = replica.sync()
+        if df.empty:
+            st.warning("No data returned.")
+            st.stop()
+        st.caption(f"Local replica: {len(df)} rows, last id {replica.last_id}, "
+                   f"synced {int(datetime.now().timestamp() - replica.last_sync)}s ago")
 
     # Filter nur bei bestimmten Tabellen
     filters = {}
     if selected_table == "event":
         with st.expander("🔎 Filter Options", expanded=True):
             col1, col2, col3 = st.columns(3)
-            filters['cmdr'] = col1.selectbox("Cmdr", [""] + sorted(df['cmdr'].dropna().unique().tolist()))
-            filters['event'] = col2.selectbox("Event", [""] + sorted(df['event'].dropna().unique().tolist()))
-            filters['tickid'] = col3.selectbox("Tick ID", [""] + sorted(df['tickid'].dropna().unique().tolist(), reverse=True))
+            if df is not None:
+                filters['cmdr'] = col1.selectbox("Cmdr", [""] + replica.distinct('cmdr'))
+                filters['event'] = col2.selectbox("Event", [""] + replica.distinct('event'))
+                filters['tickid'] = col3.selectbox("Tick ID", [""] + replica.distinct('tickid')[::-1])
+            else:
+                # Without a local copy the distinct values are unknown
+                filters['cmdr'] = col1.text_input("Cmdr").strip()
+                filters['event'] = col2.text_input("Event").strip()
+                filters['tickid'] = col3.text_input("Tick ID").strip()
             col4, col5 = st.columns(2)
             today = datetime.today().date()
             from_date = col4.date_input("From Date", value=today)
             to_date = col5.date_input("To Date", value=today + timedelta(days=1))
+            filters['from'] = from_date.isoformat() if from_date else None
+            filters['to'] = to_date.isoformat() if to_date else None
+    filters = {k: v for k, v in filters.items() if v}
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    page_size = col1.selectbox("Rows per page", PAGE_SIZES, index=1)
+    # Sorting, filtering and grouping in the grid, answered from the replica
+    server_side = replicated and col3.toggle("Server-side grid", key="table_server_side",
+                                             help="Sort, filter and group the whole replica in an AgGrid; "
+                                                  "only the current block is sent to the browser")
 
-            if filters['cmdr']:
-                df = df[df['cmdr'] == filters['cmdr']]
-            if filters['event']:
-                df = df[df['event'] == filters['event']]
-            if filters['tickid']:
-                df = df[df['tickid'] == filters['tickid']]
-            if from_date or to_date:
-                ts = pd.to_datetime(df['timestamp'], errors='coerce')
-                # Zeitzone angleichen: falls keine vorhanden, auf UTC setzen
-                if ts.dt.tz is None:
-                    ts = ts.dt.tz_localize('UTC')
-                else:
-                    ts = ts.dt.tz_convert('UTC')
-                if from_date:
-                    from_dt = pd.to_datetime(from_date).tz_localize('UTC')
-                    mask = ts >= from_dt
-                    df = df.loc[mask]
-                if to_date:
-                    to_dt = pd.to_datetime(to_date).tz_localize('UTC')
-                    # Recalculate ts after potential filtering
-                    ts = pd.to_datetime(df['timestamp'], errors='coerce')
-                    if ts.dt.tz is None:
-                        ts = ts.dt.tz_localize('UTC')
-                    else:
-                        ts = ts.dt.tz_convert('UTC')
-                    mask = ts <= to_dt
-                    df = df.loc[mask]
-
-    # Index zurücksetzen, damit Anzeige und Auswahl übereinstimmen
-    df = df.reset_index(drop=True)
-
-    st.markdown(f"### 📄 Showing {len(df)} rows from `{selected_table}`")
-    st.dataframe(df, use_container_width=True)
+    # Jump back to the first page whenever the query changes
+    query = (selected_table, tuple(sorted(filters.items())), page_size)
+    if st.session_state.get("table_query") != query:
+        st.session_state["table_query"] = query
+        st.session_state["table_page"] = 1
+    page = st.session_state.get("table_page", 1)
+
+    local = df is not None
+    if local:
+        # Date range first (binary search on the sorted index), then the
+        # equality filters on the much smaller slice
+        df = replica.time_slice(filters.get('from'), filters.get('to'))
+        df = filter_events(df, {k: v for k, v in filters.items() if k not in ('from', 'to')})
+        total = len(df)
+    else:
+        rows, total = query_table(selected_table, filters, page=page, limit=page_size,
+                                  columns=GRID_COLUMNS.get(selected_table))
+        df = to_frame(rows, name=f"Table Viewer: {selected_table}")
+        if total is None:
+            # API without filter/pagination support: fall back to local filtering
+            local = True
+            df = filter_events(df, filters)
+            total = len(df)
+
+    if total == 0:
+        st.warning("No data returned.")
+        st.stop()
+
+    lazy_column = LAZY_COLUMNS.get(selected_table)
+
+    if server_side:
+        st.markdown(f"### 📄 {total} rows from `{selected_table}`")
+        df, _ = show_server_side_grid(
+            df.reset_index(drop=True).drop(columns=[lazy_column] if lazy_column else [], errors="ignore"),
+            key=f"table_grid_{selected_table}",
+            block_size=page_size,
+            group_by_options=GROUP_COLUMNS.get(selected_table),
+            sum_columns=[],
+            height=600,
+            max_height=600
+        )
+        df = df.reset_index(drop=True)
+        if "id" not in df.columns:
+            # Grouped rows have no single record to preview
+            lazy_column = None
+    else:
+        pages = max(1, -(-total // page_size))
+        st.session_state["table_page"] = min(page, pages)
+        page = col2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="table_page")
+        if local:
+            # Only ship the selected page to the browser
+            df = df.iloc[(page - 1) * page_size:page * page_size]
+
+        # Index zurücksetzen, damit Anzeige und Auswahl übereinstimmen
+        df = df.reset_index(drop=True)
+
+        st.markdown(f"### 📄 Showing {len(df)} of {total} rows from `{selected_table}`")
+        st.dataframe(df.drop(columns=[lazy_column], errors="ignore") if lazy_column else df,
+                     use_container_width=True)
 
     # JSON Anzeige unterhalb bei Auswahl eines Datensatzes aus event
-    if selected_table == "event" and "raw_json" in df.columns and not df.empty:
+    if lazy_column and ("id" in df.columns or lazy_column in df.columns) and not df.empty:
         selected_index = st.number_input(
-            "Selected row index for raw_json view:",
+            f"Selected row index for {lazy_column} view:",
             min_value=0,
             max_value=len(df) - 1,
             value=0,
@@ -103,17 +218,29 @@ def render():
         )
 
         def show_json(row):
+            if row is None:
+                st.info(f"No {lazy_column} available for this row.")
+                return
             try:
                 parsed = json.loads(row)
             except json.JSONDecodeError:
                 try:
                     parsed = ast.literal_eval(row)  # Sicherer als eval()
                 except Exception as e:
-                    st.error(f"Failed to parse raw_json: {e}")
+                    st.error(f"Failed to parse {lazy_column}: {e}")
                     return
-            st.subheader("🧾 raw_json Preview")
+            st.subheader(f"🧾 {lazy_column} Preview")
             st.json(parsed)
 
-        show_json(df.iloc[selected_index]["raw_json"])
-    elif selected_table == "event" and df.empty:
-        st.info("No entries to show raw_json.")
+        row = df.iloc[selected_index]
+        if lazy_column in df.columns:
+            show_json(row[lazy_column])
+        else:
+            try:
+                show_json(fetch_lazy_value(selected_table, lazy_column, int(row["id"])))
+            except KeyError:
+                st.warning(f"{lazy_column} of row {int(row['id'])} not found.")
+            except Exception as e:
+                st.error(f"Failed to load {lazy_column}: {e}")
+    elif lazy_column and df.empty:
+        st.info(f"No entries to show {lazy_column}.")
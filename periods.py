@@ -0,0 +1,98 @@
+import os
+import threading
+from datetime import datetime, time, timedelta, timezone
+
+import pandas as pd
+
+# Period codes of the dashboard's period selectors
+PERIODS = ["cd", "ld", "cw", "lw", "cm", "lm", "2m", "y", "all"]
+
+# Widest period fetched once when periods are sliced locally
+SLICE_WINDOW = os.getenv("PERIOD_SLICE_WINDOW", "all")
+
+_windows = {}
+_windows_lock = threading.Lock()
+
+
+def period_range(period, now=None):
+    """UTC (start, end) of a dashboard period code, end exclusive.
+
+    cd/ld: today/yesterday, cw/lw: current/last week (Monday to Monday),
+    cm/lm: current/last month, 2m: last month until now, y: current year,
+    all: (None, None). Periods running until now have end None, so their
+    query parameters stay stable (and cacheable) during the day. Days
+    start at 00:00 UTC, not at the BGS tick.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = datetime.combine(now.date(), time(), tzinfo=timezone.utc)
+    month = today.replace(day=1)
+    last_month = (month - timedelta(days=1)).replace(day=1)
+    week = today - timedelta(days=today.weekday())
+    ranges = {
+        "cd": (today, None),
+        "ld": (today - timedelta(days=1), today),
+        "cw": (week, None),
+        "lw": (week - timedelta(days=7), week),
+        "cm": (month, None),
+        "lm": (last_month, month),
+        "2m": (last_month, None),
+        "y": (today.replace(month=1, day=1), None),
+        "all": (None, None),
+    }
+    if period not in ranges:
+        raise ValueError(f"Unknown period: {period}")
+    return ranges[period]
+
+
+def period_params(period, now=None):
+    """from/to query parameters (ISO timestamps) of a period, as sent to table/<name>"""
+    start, end = period_range(period, now)
+    params = {}
+    if start:
+        params["from"] = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if end:
+        params["to"] = end.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return params
+
+
+def in_window(period, window=None):
+    """True if period lies within the locally held window (SLICE_WINDOW by default)"""
+    window_start, window_end = period_range(window or SLICE_WINDOW)
+    start, end = period_range(period)
+    if window_start is not None and (start is None or start < window_start):
+        return False
+    return window_end is None or (end is not None and end <= window_end)
+
+
+def time_index(frame, column):
+    """frame indexed by column parsed to UTC and sorted, rows without a time first"""
+    if column in frame.columns:
+        ts = pd.to_datetime(frame[column], errors="coerce", utc=True)
+    else:
+        ts = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns, UTC]")
+    frame = frame.set_axis(pd.DatetimeIndex(ts, name=None), axis=0)
+    return frame.sort_index(kind="stable", na_position="first")
+
+
+def time_window(key, rows, column, build=pd.DataFrame):
+    """Time-indexed frame of a window payload, rebuilt only when the payload object changes"""
+    with _windows_lock:
+        cached = _windows.get(key)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+    frame = time_index(build(rows or []), column)
+    with _windows_lock:
+        _windows[key] = (rows, frame)
+    return frame
+
+
+def slice_period(frame, period, now=None):
+    """Rows of a time-indexed frame within a period, found by binary search"""
+    start, end = period_range(period, now)
+    if start is None and end is None:
+        return frame
+    untimed = int(frame.index.isna().sum())
+    index = frame.index[untimed:]
+    lo = index.searchsorted(start, side="left") if start else 0
+    hi = index.searchsorted(end, side="left") if end else len(index)
+    return frame.iloc[untimed + lo:untimed + hi]
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """A parsed API payload together with its validators and freshness info"""
+
+    __slots__ = ("value", "size", "etag", "last_modified", "ttl", "stored_at", "expired", "grace_until")
+
+    def __init__(self, value, size, etag=None, last_modified=None, ttl=60, stored_at=None):
+        self.value = value
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.ttl = ttl
+        self.stored_at = time.time() if stored_at is None else stored_at
+        # Set by expire_all(); stored_at keeps the real age for stale serving
+        self.expired = False
+        # An expired entry counts as fresh until then (time.time()), e.g. while it is refreshed
+        self.grace_until = None
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    def is_fresh(self):
+        if self.expired:
+            return False
+        return self.age < self.ttl or (self.grace_until is not None and time.time() < self.grace_until)
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of API payloads, bounded by payload bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "restored": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale": 0,
+            "hedged": 0,
+        }
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            # Payloads larger than the whole budget are never cached
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters["evictions"] += 1
+
+    def touch(self, key):
+        """Mark an entry as freshly validated (e.g. after a 304)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+                entry.expired = False
+                entry.grace_until = None
+
+    def invalidate(self, prefix=""):
+        """Drop all entries whose key starts with prefix"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key).size
+                self._counters["invalidations"] += 1
+
+    def expire_all(self):
+        """Force revalidation of every entry without discarding its validators"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.expired = True
+
+    def record(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"] + stats["revalidated"]
+        stats["hit_ratio"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
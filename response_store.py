@@ -0,0 +1,126 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from response_cache import CacheEntry
+
+
+class ResponseStore:
+    """SQLite-backed, zlib-compressed copy of API responses.
+
+    Lets a restarted dashboard serve the last known payloads immediately.
+    The store is bounded by compressed bytes; least recently used rows are
+    evicted first. Responses larger than max_entry_bytes (uncompressed) are
+    not stored.
+    """
+
+    def __init__(self, path, max_bytes, max_entry_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS api_responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                ttl REAL NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_api_responses_accessed ON api_responses (accessed_at)"
+        )
+
+    def load(self, key):
+        """Return the stored CacheEntry for key, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, raw_size, etag, last_modified, ttl, stored_at FROM api_responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE api_responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        body, raw_size, etag, last_modified, ttl, stored_at = row
+        try:
+            value = json.loads(zlib.decompress(body))
+        except (zlib.error, ValueError):
+            with self._lock:
+                self._conn.execute("DELETE FROM api_responses WHERE key = ?", (key,))
+            return None
+        return CacheEntry(value, raw_size, etag=etag, last_modified=last_modified, ttl=ttl, stored_at=stored_at)
+
+    def save(self, key, entry, raw_body):
+        """Store the raw JSON body of a response together with its cache metadata"""
+        if self.max_entry_bytes is not None and entry.size > self.max_entry_bytes:
+            # An older, smaller copy must not be served for it either
+            self.delete_key(key)
+            return
+        body = zlib.compress(raw_body, 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO api_responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, body, len(body), entry.size, entry.etag, entry.last_modified,
+                 entry.ttl, entry.stored_at, now)
+            )
+            self._evict()
+
+    def touch(self, key, stored_at=None):
+        """Record a successful revalidation of key"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE api_responses SET stored_at = ? WHERE key = ?",
+                (stored_at or time.time(), key)
+            )
+
+    def delete_key(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM api_responses WHERE key = ?", (key,))
+
+    def delete(self, prefix=""):
+        """Delete rows whose key starts with prefix (all rows by default)"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM api_responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM api_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM api_responses ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM api_responses WHERE key = ?", victims)
+
+    def stats(self):
+        with self._lock:
+            entries, size, raw_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM api_responses"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "raw_bytes": raw_size,
+            "max_bytes": self.max_bytes,
+        }
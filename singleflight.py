@@ -0,0 +1,56 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["executed"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls)
+        return stats
@@ -0,0 +1,131 @@
+"""Minimal stand-in for the Flask API, for local development of the dashboard.
+
+Serves generated sample data for ``table/<name>`` and implements the query
+parameters the dashboard pushes down (cmdr, event, tickid, id, from, to,
+since_id, columns, page, limit) including the X-Total-Count header and ETag
+revalidation. Every other GET returns an empty list.
+
+Usage:
+    python stub_api.py --port 5000
+    API_BASE=http://localhost:5000/api streamlit run app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CMDRS = ["JanJonTheo", "NavlGazr", "Aussi", "Kiwi", "Orion", "Vega"]
+EVENTS = ["MarketBuy", "MarketSell", "MissionCompleted", "RedeemVoucher", "FactionKillBond", "SellExplorationData"]
+SYSTEMS = ["Kachian", "Sol", "Heverty", "Ross 128"]
+
+
+def make_events(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=10)
+    rows = []
+    for i in range(1, count + 1):
+        ts = start + timedelta(seconds=i * 10 * 86400 // count)
+        event = rng.choice(EVENTS)
+        cmdr = rng.choice(CMDRS)
+        rows.append({
+            "id": i,
+            "event": event,
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "tickid": f"tick-{ts:%Y%m%d}",
+            "cmdr": cmdr,
+            "starsystem": rng.choice(SYSTEMS),
+            "raw_json": json.dumps({"event": event, "Commander": cmdr, "Amount": rng.randint(1000, 10 ** 7)}),
+        })
+    return rows
+
+
+class StubState:
+    tables = {}
+
+
+def apply_query(rows, query):
+    for field in ("cmdr", "event", "tickid"):
+        if field in query:
+            rows = [row for row in rows if str(row.get(field)) == query[field]]
+    if "id" in query:
+        ids = {int(i) for i in query["id"].split(",")}
+        rows = [row for row in rows if row.get("id") in ids]
+    if "since_id" in query:
+        rows = [row for row in rows if row.get("id", 0) > int(query["since_id"])]
+    # ISO timestamps compare correctly as strings
+    if "from" in query:
+        rows = [row for row in rows if str(row.get("timestamp", "")) >= query["from"]]
+    if "to" in query:
+        rows = [row for row in rows if str(row.get("timestamp", "")) <= query["to"]]
+    return rows
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.split("/api/", 1)[-1].strip("/")
+        if not path.startswith("table/"):
+            self.send_json([])
+            return
+
+        rows = apply_query(StubState.tables.get(path[len("table/"):], []), query)
+        headers = {}
+        if "limit" in query:
+            total = len(rows)
+            limit = int(query["limit"])
+            page = int(query.get("page", 1))
+            rows = rows[(page - 1) * limit:page * limit]
+            headers["X-Total-Count"] = str(total)
+        if "columns" in query:
+            columns = query["columns"].split(",")
+            rows = [{c: row[c] for c in columns if c in row} for row in rows]
+        self.send_json(rows, headers=headers)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/").endswith("/login"):
+            self.send_json({"username": payload.get("username", "stub"), "is_admin": True})
+        else:
+            self.send_json({"status": "ok"}, status=201)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20000, help="number of generated event rows")
+    args = parser.parse_args()
+
+    StubState.tables["event"] = make_events(args.events)
+    StubState.tables["cmdr"] = [{"id": i, "name": name} for i, name in enumerate(CMDRS, 1)]
+
+    print(f"Stub API listening on http://localhost:{args.port}/api")
+    ThreadingHTTPServer(("", args.port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
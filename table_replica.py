@@ -0,0 +1,224 @@
+import glob
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+import api_client
+import frames
+
+# Min. seconds between two incremental syncs of the same table
+SYNC_INTERVAL = int(os.getenv("REPLICA_SYNC_INTERVAL", "30"))
+# Seconds after which a full resync is forced as a safety net
+FULL_RESYNC_INTERVAL = int(os.getenv("REPLICA_FULL_RESYNC_INTERVAL", "86400"))
+# Optional directory for Parquet files, so the replica survives restarts
+REPLICA_DIR = os.getenv("REPLICA_DIR")
+
+# to_parquet/read_parquet need pyarrow or fastparquet
+if REPLICA_DIR and not any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")):
+    logging.getLogger(__name__).warning(
+        "REPLICA_DIR is set but neither pyarrow nor fastparquet is installed, replicas are kept in memory only")
+    REPLICA_DIR = None
+
+
+class TableReplica:
+    """Local, incrementally synced copy of an API table.
+
+    The first sync downloads the whole table; later syncs only ask for rows
+    with an id greater than the last one seen (``since_id``). A full resync
+    happens when the server answers with ``X-Table-Reset: 1`` or HTTP 410,
+    when it ignores ``since_id`` and returns old rows, or after
+    FULL_RESYNC_INTERVAL seconds.
+
+    With ``columns`` set, only those columns are requested (``columns=``
+    query parameter) and kept locally.
+
+    With ``time_column`` set, the frame is indexed by that column parsed once
+    to UTC and kept sorted, so date ranges are binary-search slices.
+    """
+
+    def __init__(self, table, id_column="id", columns=None, time_column=None):
+        self.table = table
+        self.id_column = id_column
+        self.columns = columns
+        self.time_column = time_column
+        self.frame = pd.DataFrame()
+        self._distinct = {}
+        self._untimed = 0
+        self.last_id = None
+        self.last_sync = 0.0
+        self.last_full_sync = 0.0
+        self.rows_fetched = 0
+        self._parts = 0
+        self._lock = threading.Lock()
+        if REPLICA_DIR:
+            self._load_parts()
+
+    def sync(self, force_full=False):
+        """Bring the replica up to date and return the current frame"""
+        with self._lock:
+            now = time.time()
+            if not force_full and now - self.last_sync < SYNC_INTERVAL:
+                return self.frame
+            if force_full or self.last_id is None or now - self.last_full_sync > FULL_RESYNC_INTERVAL:
+                self._full_sync()
+            else:
+                self._incremental_sync()
+            self.last_sync = time.time()
+            return self.frame
+
+    def _fetch(self, params=None):
+        params = dict(params or {})
+        if self.columns:
+            params["columns"] = ",".join(self.columns)
+        r = api_client.request("GET", f"table/{self.table}", params=params)
+        if r.status_code == 410:
+            return None, True
+        r.raise_for_status()
+        rows = api_client.decode_json(r, f"table/{self.table}") or []
+        api_client.note_tick(rows)
+        return rows, r.headers.get("X-Table-Reset") == "1"
+
+    def _full_sync(self):
+        rows, _ = self._fetch()
+        self._replace(self._to_frame(rows or [], report=True))
+        self.last_full_sync = time.time()
+
+    def _incremental_sync(self):
+        rows, reset = self._fetch({"since_id": self.last_id})
+        if reset:
+            self._full_sync()
+            return
+        new = self._to_frame(rows)
+        if new.empty:
+            return
+        if self.id_column in new.columns and new[self.id_column].min() <= self.last_id:
+            # The server ignored since_id and sent a full snapshot
+            self._replace(new)
+            self.last_full_sync = time.time()
+            return
+        self._set_frame(self._append(self.frame, new))
+        self._update_last_id(new)
+        if REPLICA_DIR:
+            self._write_part(new)
+
+    def _to_frame(self, rows, report=False):
+        frame = pd.DataFrame(rows)
+        self.rows_fetched += len(frame)
+        if self.columns:
+            # Older APIs ignore the projection, so apply it locally as well
+            frame = frame[[c for c in frame.columns if c in self.columns]]
+        compacted = frames.compact(frame)
+        if report:
+            frames.record_savings(f"Replica: {self.table}", frame, compacted)
+        frame = compacted
+        if self.id_column in frame.columns:
+            frame = frame.sort_values(self.id_column, kind="stable", ignore_index=True)
+        return self._index_by_time(frame)
+
+    def _index_by_time(self, frame):
+        # Parsed once per fetched batch, not once per page render
+        if not self.time_column or self.time_column not in frame.columns:
+            return frame
+        ts = pd.to_datetime(frame[self.time_column], errors="coerce", utc=True)
+        return self._sort_by_time(frame.set_axis(pd.DatetimeIndex(ts, name=None), axis=0))
+
+    def _sort_by_time(self, frame):
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            return frame
+        # Rows without a parseable time are kept in front of the sorted part.
+        # Rows normally arrive in time order, so this rarely has to sort.
+        nat = int(frame.index.isna().sum())
+        if not (frame.index[:nat].isna().all() and frame.index[nat:].is_monotonic_increasing):
+            frame = frame.sort_index(kind="stable", na_position="first")
+        return frame
+
+    def _append(self, frame, new):
+        if frame.empty:
+            return new
+        return self._sort_by_time(frames.concat([frame, new]))
+
+    def _set_frame(self, frame):
+        self.frame = frame
+        self._distinct = {}
+        self._untimed = int(frame.index.isna().sum()) if isinstance(frame.index, pd.DatetimeIndex) else 0
+
+    def time_slice(self, start=None, end=None):
+        """Rows with start <= time <= end (UTC), found by binary search"""
+        frame, untimed = self.frame, self._untimed
+        if not isinstance(frame.index, pd.DatetimeIndex) or frame.empty or not (start or end):
+            return frame
+        index = frame.index[untimed:]
+        lo = index.searchsorted(pd.Timestamp(start, tz="UTC"), side="left") if start else 0
+        hi = index.searchsorted(pd.Timestamp(end, tz="UTC"), side="right") if end else len(index)
+        return frame.iloc[untimed + lo:untimed + hi]
+
+    def distinct(self, column):
+        """Sorted distinct non-null values of a column, cached until the next change"""
+        if column not in self._distinct:
+            values = self.frame[column].dropna().unique().tolist() if column in self.frame.columns else []
+            self._distinct[column] = sorted(values)
+        return self._distinct[column]
+
+    def _replace(self, frame):
+        self._set_frame(frame)
+        self.last_id = None
+        self._update_last_id(frame)
+        if REPLICA_DIR:
+            for path in self._part_paths():
+                os.remove(path)
+            self._parts = 0
+            self._write_part(frame)
+
+    def _update_last_id(self, frame):
+        if self.id_column in frame.columns and not frame.empty:
+            self.last_id = int(frame[self.id_column].max())
+
+    def _part_paths(self):
+        return sorted(glob.glob(os.path.join(REPLICA_DIR, f"{self.table}-*.parquet")))
+
+    def _write_part(self, frame):
+        if frame.empty:
+            return
+        os.makedirs(REPLICA_DIR, exist_ok=True)
+        self._parts += 1
+        frame.to_parquet(os.path.join(REPLICA_DIR, f"{self.table}-{self._parts:06d}.parquet"), index=False)
+
+    def _load_parts(self):
+        paths = self._part_paths()
+        if not paths:
+            return
+        try:
+            frame = frames.concat([pd.read_parquet(path) for path in paths]).reset_index(drop=True)
+        except Exception:
+            return
+        self._parts = len(paths)
+        self._set_frame(self._index_by_time(frame))
+        self._update_last_id(frame)
+        # Parts on disk are trusted until the next scheduled full resync
+        self.last_full_sync = max(os.path.getmtime(path) for path in paths)
+
+    def stats(self):
+        return {
+            "table": self.table,
+            "rows": len(self.frame),
+            "last_id": self.last_id,
+            "last_sync": self.last_sync,
+            "last_full_sync": self.last_full_sync,
+            "rows_fetched": self.rows_fetched,
+            "bytes": int(self.frame.memory_usage(deep=True).sum()) if not self.frame.empty else 0,
+        }
+
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+def get_replica(table, columns=None, time_column=None):
+    """Return the process-wide replica of an API table (options apply on first use)"""
+    with _replicas_lock:
+        if table not in _replicas:
+            _replicas[table] = TableReplica(table, columns=columns, time_column=time_column)
+        return _replicas[table]
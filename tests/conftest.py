@@ -0,0 +1,32 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_client
+import stub_api
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """stub_api on a free port, with 500 generated events; yields StubState.tables"""
+    tables = {
+        "event": stub_api.make_events(500),
+        "cmdr": [{"id": i, "name": name} for i, name in enumerate(stub_api.CMDRS, 1)],
+    }
+    monkeypatch.setattr(stub_api.StubState, "tables", tables)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub_api.Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(api_client, "API_BASE", f"http://127.0.0.1:{server.server_address[1]}/api")
+    api_client.clear_cache()
+    try:
+        yield tables
+    finally:
+        server.shutdown()
+        server.server_close()
+        api_client.clear_cache()
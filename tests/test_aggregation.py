@@ -0,0 +1,50 @@
+import json
+
+import aggregation
+import api_client
+
+
+def _journal_rows():
+    rows = []
+    for i, (event, payload) in enumerate([
+        ("MarketBuy", {"TotalCost": 100, "Count": 2}),
+        ("MarketSell", {"TotalSale": 300, "Count": 2}),
+        ("RedeemVoucher", {"Type": "bounty", "Amount": 5000}),
+        ("MissionFailed", "not parsed"),
+        ("FSDJump", "not parsed either"),
+    ], 1):
+        rows.append({"id": i, "event": event, "cmdr": "Vega", "tickid": "tick-1",
+                     "timestamp": f"2020-01-01T00:00:{i:02d}Z", "raw_json": json.dumps(payload)})
+    return rows
+
+
+def test_only_needed_events_are_parsed(monkeypatch):
+    parsed = []
+    journal = aggregation._journal
+    monkeypatch.setattr(aggregation, "_journal", lambda raw: parsed.append(raw) or journal(raw))
+    events = aggregation.parse_events(_journal_rows())
+    assert sorted(events["kind"].astype(str)) == ["MarketBuy", "MarketSell", "MissionFailed", "RedeemVoucher:bounty"]
+    assert len(parsed) == 3
+
+    summaries = aggregation.summarize(events)
+    assert summaries["market-events"][0]["total_transaction_volume"] == 400
+    assert summaries["bounty-vouchers"][0]["bounty_vouchers"] == 5000
+    assert summaries["missions-failed"][0]["missions_failed"] == 1
+
+
+def test_events_are_requested_per_period_and_sliced_locally(stub_server, monkeypatch):
+    monkeypatch.setattr(aggregation, "_events", {})
+    requests = []
+    get_json = api_client.get_json
+    monkeypatch.setattr(api_client, "get_json", lambda path, params=None, **kw: requests.append(params) or
+                        get_json(path, params, **kw))
+
+    today = aggregation.get_events("cd")
+    assert "from" in requests[0]
+    assert requests[0]["columns"] == ",".join(aggregation.EVENT_COLUMNS)
+    assert len(today) and today.index.min() >= today.index.max().normalize()
+    assert "FactionKillBond" not in set(today["kind"].astype(str))
+
+    # The parsed frame is reused, not the payload
+    assert aggregation.get_events("cd") is today
+    assert len(requests) == 1
@@ -0,0 +1,43 @@
+import pytest
+import requests
+
+import api_client
+import api_metrics
+from circuit_breaker import CircuitBreaker
+
+
+class FailingSession:
+    def __init__(self, error):
+        self.error = error
+
+    def request(self, *args, **kwargs):
+        raise self.error
+
+
+def test_half_open_trial_ends_on_any_request_error(monkeypatch):
+    breaker = CircuitBreaker(failures=1, reset_after=0)
+    monkeypatch.setattr(api_client, "_breaker", breaker)
+    monkeypatch.setattr(api_client, "API_BASE", "http://api.invalid")
+
+    monkeypatch.setattr(api_client, "get_session", lambda: FailingSession(requests.ConnectionError()))
+    with pytest.raises(requests.ConnectionError):
+        api_client.request("GET", "systems/list")
+    assert breaker.state() == "half-open"
+
+    # The trial fails with an error that is not a connection error
+    monkeypatch.setattr(api_client, "get_session", lambda: FailingSession(requests.exceptions.ChunkedEncodingError()))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        api_client.request("GET", "systems/list")
+    assert breaker.stats()["consecutive_failures"] == 2
+    # ...so after reset_after another trial is let through
+    assert breaker.allow()
+
+
+def test_every_request_error_is_counted(monkeypatch):
+    monkeypatch.setattr(api_client, "_breaker", CircuitBreaker(failures=5, reset_after=30))
+    monkeypatch.setattr(api_metrics, "_endpoints", {})
+    monkeypatch.setattr(api_client, "get_session", lambda: FailingSession(requests.TooManyRedirects()))
+    with pytest.raises(requests.TooManyRedirects):
+        api_client.request("GET", "systems/list")
+    report = api_metrics.endpoint_report()["systems/list"]
+    assert (report["requests"], report["errors"]) == (1, 1)
@@ -0,0 +1,27 @@
+import api_client
+import api_metrics
+
+
+def test_hedge_threshold_follows_recorded_latency(monkeypatch):
+    monkeypatch.setattr(api_client, "HEDGE_AFTER", None)
+    monkeypatch.setattr(api_metrics, "_endpoints", {})
+    path = "systems/Sol/status?period=cd"
+    assert api_client._hedge_after(path) == 0  # no samples yet
+
+    for i in range(api_client.HEDGE_MIN_SAMPLES):
+        api_metrics.record_request(path, 1.0 + i / 100)
+    assert 1.0 < api_client._hedge_after("systems/Kachian/status") <= 1.2
+
+    for slow in ("summary/market-events?period=all", "bounty-vouchers?period=y", "table/event"):
+        for _ in range(api_client.HEDGE_MIN_SAMPLES):
+            api_metrics.record_request(slow, 1.0)
+        assert api_client._hedge_after(slow) == 0
+
+
+def test_background_gets_are_not_hedged(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_client, "HEDGE_AFTER", 0.01)
+    monkeypatch.setattr(api_client, "request", lambda *args, **kwargs: calls.append(args) or "r")
+    monkeypatch.setattr(api_client._hedge, "submit", lambda *args, **kwargs: 1 / 0)
+    assert api_client._get("systems/list") == "r"
+    assert len(calls) == 1
@@ -0,0 +1,19 @@
+import time
+
+from response_cache import CacheEntry, ResponseCache
+
+
+def test_expire_all_keeps_the_age_of_entries():
+    cache = ResponseCache(1024)
+    stored_at = time.time() - 30
+    cache.put("k", CacheEntry([1], 10, etag='"a"', ttl=60, stored_at=stored_at))
+    cache.expire_all()
+
+    entry = cache.get("k")
+    assert not entry.is_fresh()
+    # Still young enough to be served stale while the API is down
+    assert 29 < entry.age < 40
+    assert entry.validators() == {"If-None-Match": '"a"'}
+
+    cache.touch("k")
+    assert cache.get("k").is_fresh()
@@ -0,0 +1,36 @@
+import json
+import time
+
+import api_client
+from response_cache import CacheEntry, ResponseCache
+from response_store import ResponseStore
+
+
+def _save(store, key, payload, stored_at=None):
+    body = json.dumps(payload).encode()
+    store.save(key, CacheEntry(payload, len(body), ttl=60, stored_at=stored_at), body)
+
+
+def test_payloads_over_the_entry_limit_are_not_stored(tmp_path):
+    store = ResponseStore(str(tmp_path / "cache.db"), 1024 * 1024, max_entry_bytes=100)
+    _save(store, "small", [1, 2, 3])
+    _save(store, "big", ["x" * 200])
+    assert store.load("small").value == [1, 2, 3]
+    assert store.load("big") is None
+
+    # A payload growing past the limit drops its older copy
+    _save(store, "small", ["x" * 200])
+    assert store.load("small") is None
+
+
+def test_restored_entries_keep_their_age(tmp_path, monkeypatch):
+    store = ResponseStore(str(tmp_path / "cache.db"), 1024 * 1024)
+    _save(store, "systems/list", {"systems": []}, stored_at=time.time() - 600)
+    monkeypatch.setattr(api_client, "_store", store)
+    monkeypatch.setattr(api_client, "_cache", ResponseCache(1024 * 1024))
+    monkeypatch.setattr(api_client, "_refresh", lambda *args: None)
+
+    entry = api_client._load_from_store("systems/list", "systems/list", None, 60)
+    # Served as fresh during the refresh grace period, with its real age
+    assert entry.is_fresh()
+    assert entry.age >= 600
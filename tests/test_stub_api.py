@@ -0,0 +1,44 @@
+import pytest
+
+import api_client
+import stub_api
+from pages.view_table import fetch_lazy_value
+
+
+def test_query_table_pushes_filters_down(stub_server):
+    cmdr = stub_server["event"][0]["cmdr"]
+    expected = [row for row in stub_server["event"] if row["cmdr"] == cmdr and row["event"] == "MarketBuy"]
+
+    rows, total = api_client.query_table("event", {"cmdr": cmdr, "event": "MarketBuy", "tickid": ""},
+                                         limit=10, columns=["id", "cmdr", "event"])
+    assert total == len(expected)
+    assert [row["id"] for row in rows] == [row["id"] for row in expected[:10]]
+    assert all(set(row) == {"id", "cmdr", "event"} for row in rows)
+
+
+def test_query_table_reports_x_total_count_only_with_limit(stub_server):
+    rows, total = api_client.query_table("event", page=3, limit=100)
+    assert total == 500
+    assert [row["id"] for row in rows] == list(range(201, 301))
+
+    rows, total = api_client.query_table("event")
+    assert total is None
+    assert len(rows) == 500
+
+
+def test_fetch_lazy_value(stub_server):
+    fetch_lazy_value.cache_clear()
+    assert fetch_lazy_value("event", "raw_json", 123) == stub_server["event"][122]["raw_json"]
+    with pytest.raises(KeyError):
+        fetch_lazy_value("event", "raw_json", 9999)
+
+
+def test_fetch_lazy_value_when_the_id_filter_is_ignored(stub_server, monkeypatch):
+    # Paginates and sends X-Total-Count, but returns the first page of the table
+    apply_query = stub_api.apply_query
+    monkeypatch.setattr(stub_api, "apply_query",
+                        lambda rows, query: apply_query(rows, {k: v for k, v in query.items() if k != "id"}))
+    fetch_lazy_value.cache_clear()
+    assert fetch_lazy_value("event", "raw_json", 1) == stub_server["event"][0]["raw_json"]
+    with pytest.raises(KeyError):
+        fetch_lazy_value("event", "raw_json", 123)
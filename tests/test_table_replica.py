@@ -0,0 +1,36 @@
+import pandas as pd
+
+import frames
+import stub_api
+from table_replica import TableReplica
+
+COLUMNS = ["id", "event", "timestamp", "tickid", "cmdr", "starsystem"]
+
+
+def test_small_incremental_batch_keeps_categories(stub_server):
+    replica = TableReplica("event", columns=COLUMNS, time_column="timestamp")
+    replica.sync(force_full=True)
+    assert isinstance(replica.frame["cmdr"].dtype, pd.CategoricalDtype)
+
+    # Fewer rows than frames.MIN_ROWS, so compact() leaves the batch as object
+    new = stub_api.make_events(510, seed=7)[500:]
+    assert len(new) < frames.MIN_ROWS
+    stub_server["event"].extend(new)
+    replica.last_sync = 0  # skip SYNC_INTERVAL, last_id is set so this sync is incremental
+    replica.sync()
+
+    frame = replica.frame
+    assert len(frame) == 510
+    for col in ("cmdr", "event", "tickid"):
+        assert isinstance(frame[col].dtype, pd.CategoricalDtype), col
+    assert sorted(frame["id"]) == list(range(1, 511))
+
+
+def test_concat_converts_object_columns_next_to_categoricals():
+    big = pd.DataFrame({"cmdr": pd.Categorical(["A", "B"]), "raw": [[1], [2]]})
+    small = pd.DataFrame({"cmdr": ["C", None], "raw": [[3], [4]]})
+    result = frames.concat([big, small])
+    assert isinstance(result["cmdr"].dtype, pd.CategoricalDtype)
+    assert result["cmdr"].tolist()[:3] == ["A", "B", "C"]
+    # Non-string objects are left alone
+    assert result["raw"].dtype == object
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import api_client
+import influence_history
+import stub_api
+import warmer
+
+
+def _reset(monkeypatch):
+    monkeypatch.setitem(api_client._tick, "tickid", None)
+    monkeypatch.setitem(api_client._tick, "timestamp", None)
+    for key in ("last_probe", "probe"):
+        monkeypatch.setitem(warmer._state, key, None)
+
+
+def _requests(monkeypatch):
+    queries = []
+    apply_query = stub_api.apply_query
+
+    def recording(rows, query):
+        queries.append(dict(query))
+        return apply_query(rows, query)
+    monkeypatch.setattr(stub_api, "apply_query", recording)
+    return queries
+
+
+def test_probe_is_capped_and_sees_the_newest_tick(stub_server, monkeypatch):
+    _reset(monkeypatch)
+    queries = _requests(monkeypatch)
+    warmer._probe()
+    assert warmer._state["probe"] == "ok"
+    assert all(int(q["limit"]) == warmer.WARMER_PROBE_LIMIT and "from" in q for q in queries)
+    assert api_client.current_tick() == stub_server["event"][-1]["tickid"]
+
+
+def test_probe_detects_an_ignored_from_filter(stub_server, monkeypatch):
+    _reset(monkeypatch)
+    queries = _requests(monkeypatch)
+    apply_query = stub_api.apply_query
+    monkeypatch.setattr(stub_api, "apply_query",
+                        lambda rows, query: apply_query(rows, {k: v for k, v in query.items() if k != "from"}))
+    warmer._probe()
+    assert warmer._state["probe"] == "from ignored"
+    assert all("limit" in q for q in queries)
+    # The last page was fetched, so the newest tick is still found
+    assert api_client.current_tick() == stub_server["event"][-1]["tickid"]
+
+
+class FakeResponse:
+    status_code = 200
+    content = b"[]"
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return []
+
+
+def test_warm_all_keeps_to_warmer_workers_after_a_tick(monkeypatch):
+    paths = [f"summary/market-events?period={i}" for i in range(8)]
+    monkeypatch.setattr(warmer, "datasets", lambda: [("Test", path) for path in paths])
+    monkeypatch.setattr(warmer, "WARMER_WORKERS", 2)
+    monkeypatch.setattr(api_client, "STALE_WAIT", 0.01)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_request(method, path, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return FakeResponse()
+    monkeypatch.setattr(api_client, "request", slow_request)
+
+    api_client.clear_cache()
+    warmer.warm_all()
+    api_client._cache.expire_all()  # a new tick
+    warmer.warm_all()
+
+    assert peak[0] <= 2
+    assert all(api_client.cache_state(path) == "fresh" for path in paths)
+    api_client.clear_cache()
+
+
+def test_revalidations_are_shared_per_key(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(api_client, "_fetch_cached", lambda *args: release.wait(5))
+    first = api_client._revalidation("k", "systems/list", None, 60)
+    assert api_client._revalidation("k", "systems/list", None, 60) is first
+    release.set()
+    first.result(timeout=5)
+    time.sleep(0.05)
+    assert "k" not in api_client._revalidating
+
+
+def test_warm_all_records_influence_of_every_system(monkeypatch, tmp_path):
+    history = influence_history.InfluenceHistory(str(tmp_path / "history.db"))
+    monkeypatch.setattr(influence_history, "get_history", lambda: history)
+    monkeypatch.setattr(warmer, "datasets", lambda: [("Systems", "systems/list")])
+    systems = {"systems": [{"system_name": "Sol"}, {"system_name": "Kachian"}]}
+
+    def refresh(path):
+        if path == "systems/list":
+            return systems
+        name = path.split("/")[1]
+        return {"system_name": name, "edsm_data": {"last_updated": "2020-01-01 12:00:00",
+                                                   "factions": [{"name": f"{name} Party", "influence": 0.5}]}}
+    monkeypatch.setattr(api_client, "refresh", refresh)
+    monkeypatch.setattr(api_client, "get_json", lambda path, **kwargs: systems)
+
+    warmer.warm_all()
+    assert warmer._state["history_recorded"] == 2
+    assert history.history("Kachian")["Faction"].tolist() == ["Kachian Party"]
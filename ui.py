@@ -0,0 +1,31 @@
+import streamlit as st
+
+
+def lazy_tabs(labels, key):
+    """Tab bar that only runs the selected section.
+
+    st.tabs executes every tab body on each rerun; here the caller renders
+    only the section for the returned label.
+    """
+    last_key = f"_{key}_last"
+    # Clicking the active option deselects it, keep the last tab instead
+    if st.session_state.get(key) not in labels:
+        st.session_state[key] = st.session_state.get(last_key, labels[0])
+    selected = st.segmented_control(key, labels, key=key, label_visibility="collapsed")
+    st.session_state[last_key] = selected
+    return selected
+
+
+def cached_section(key, build, *sources):
+    """Build a section's data on first use and reuse it in this session.
+
+    The result is rebuilt when one of the sources (e.g. an API payload) is a
+    different object than last time.
+    """
+    sections = st.session_state.setdefault("_sections", {})
+    entry = sections.get(key)
+    if entry is not None and len(entry[0]) == len(sources) and all(a is b for a, b in zip(entry[0], sources)):
+        return entry[1]
+    value = build()
+    sections[key] = (sources, value)
+    return value
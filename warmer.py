@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+import api_client
+import influence_history
+from periods import PERIODS
+
+# Background thread that refills the response cache after each BGS tick
+WARMER_ENABLED = os.getenv("WARMER_ENABLED", "1") == "1"
+# Max. concurrent requests while warming, to spare the API
+WARMER_WORKERS = int(os.getenv("WARMER_WORKERS", "2"))
+# Seconds between two tick probes
+WARMER_INTERVAL = int(os.getenv("WARMER_INTERVAL", "60"))
+# Max. event rows per tick probe
+WARMER_PROBE_LIMIT = int(os.getenv("WARMER_PROBE_LIMIT", "100"))
+# Columns the tick probe asks for
+PROBE_COLUMNS = ["tickid", "timestamp"]
+# Period of the systems/<name>/status payloads warmed for the influence history
+STATUS_PERIOD = "cd"
+
+_thread = None
+_thread_lock = threading.Lock()
+_wake = threading.Event()
+_lock = threading.Lock()
+# path -> last warming result of that path
+_results = {}
+_state = {"tick": None, "forced": False, "runs": 0, "running": False,
+          "last_run": None, "last_duration": None, "last_probe": None, "probe": None,
+          "history_recorded": None}
+
+
+def datasets():
+    """(dataset, path) of every payload the warmer keeps cached, paths as the pages request them"""
+    from pages.evaluations import ENDPOINTS
+
+    items = [("Systems", "systems/list"), ("Cmdrs", "table/cmdr")]
+    for period in PERIODS:
+        items.append(("Leaderboard", f"summary/leaderboard?period={period}"))
+        items.append(("Redeem Vouchers", f"bounty-vouchers?period={period}"))
+        items.append(("Space CZ", f"syntheticcz-summary?period={period}"))
+        items.append(("Ground CZ", f"syntheticgroundcz-summary?period={period}"))
+        for label, endpoint in ENDPOINTS.items():
+            items.append((f"Evaluations: {label}", f"summary/{endpoint}?period={period}"))
+            items.append((f"Evaluations Top 5: {label}", f"summary/top5/{endpoint}?period={period}"))
+    return items
+
+
+def start():
+    """Start the warmer thread once per process (no-op if WARMER_ENABLED is off)"""
+    global _thread
+    if not WARMER_ENABLED:
+        return
+    with _thread_lock:
+        if _thread is None:
+            api_client.on_tick(lambda tickid: _wake.set())
+            _thread = threading.Thread(target=_run, name="cache-warmer", daemon=True)
+            _thread.start()
+
+
+def trigger():
+    """Warm everything now instead of waiting for the next tick"""
+    with _lock:
+        _state["forced"] = True
+    _wake.set()
+
+
+def _run():
+    while True:
+        tick = api_client.current_tick()
+        with _lock:
+            due = _state["runs"] == 0 or _state["forced"] or tick != _state["tick"]
+            _state["tick"], _state["forced"] = tick, False
+        if due:
+            try:
+                warm_all()
+            except Exception:
+                pass
+        _wake.wait(WARMER_INTERVAL)
+        _wake.clear()
+        _probe()
+
+
+def _probe():
+    # Newest events since the last probe, at most WARMER_PROBE_LIMIT rows;
+    # query_table() hands them to note_tick()
+    now = datetime.now(timezone.utc)
+    with _lock:
+        if _state["probe"] == "unsupported":
+            return
+        since = _state["last_probe"] or now - timedelta(minutes=15)
+        _state["last_probe"] = now
+    start = (since - timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        rows, total = api_client.query_table("event", {"from": start}, limit=WARMER_PROBE_LIMIT,
+                                             columns=PROBE_COLUMNS)
+        if total is None:
+            # No pagination support: every probe would download the whole table
+            result = "unsupported"
+        else:
+            result = "ok"
+            if any(str(row.get("timestamp") or "") < start for row in rows):
+                # from was ignored, the newest events are on the last page of the table
+                result = "from ignored"
+            last_page = -(-total // WARMER_PROBE_LIMIT)
+            if last_page > 1:
+                api_client.query_table("event", {"from": start} if result == "ok" else None, page=last_page,
+                                       limit=WARMER_PROBE_LIMIT, columns=PROBE_COLUMNS)
+    except Exception as e:
+        result = f"error: {e}"
+    with _lock:
+        _state["probe"] = result
+
+
+def warm_all():
+    """Fetch every dataset into the response cache, WARMER_WORKERS at a time"""
+    paths = list(dict.fromkeys(path for _, path in datasets()))
+    started = time.time()
+    with _lock:
+        _state["running"] = True
+    try:
+        # refresh() waits for the API itself, so at most WARMER_WORKERS requests are in flight
+        with ThreadPoolExecutor(max_workers=WARMER_WORKERS, thread_name_prefix="cache-warmer") as pool:
+            futures = {pool.submit(api_client.refresh, path): path for path in paths}
+            for future in as_completed(futures):
+                error = future.exception()
+                with _lock:
+                    _results[futures[future]] = {"warmed_at": time.time(), "error": str(error) if error else None}
+            recorded = _record_influence(pool)
+        with _lock:
+            _state["history_recorded"] = recorded
+    finally:
+        with _lock:
+            _state["running"] = False
+            _state["runs"] += 1
+            _state["last_run"] = started
+            _state["last_duration"] = time.time() - started
+
+
+def _record_influence(pool):
+    # Every system's status once per tick, so the influence history also
+    # fills in for systems nobody opens on the Systems page
+    try:
+        systems = api_client.get_json("systems/list", hedge=False).get("systems", [])
+    except Exception:
+        return None
+    names = [system["system_name"] for system in systems if system.get("system_name")]
+    futures = {pool.submit(api_client.refresh, f"systems/{name}/status?period={STATUS_PERIOD}"): name
+               for name in names}
+    recorded = 0
+    for future in as_completed(futures):
+        try:
+            recorded += influence_history.record_status(futures[future], future.result())
+        except Exception:
+            pass
+    return recorded
+
+
+def status():
+    """Warmer state and one row per dataset: warm (fresh in cache), stale, cold or error"""
+    with _lock:
+        state = dict(_state, enabled=WARMER_ENABLED, thread_alive=_thread is not None and _thread.is_alive())
+        results = dict(_results)
+    rows = []
+    for dataset, path in datasets():
+        result = results.get(path, {})
+        cached = api_client.cache_state(path)
+        rows.append({
+            "dataset": dataset,
+            "path": path,
+            "state": "error" if result.get("error") and cached is None else
+                     {"fresh": "warm", "stale": "stale"}.get(cached, "cold"),
+            "warmed_at": result.get("warmed_at"),
+            "error": result.get("error"),
+        })
+    return state, rows